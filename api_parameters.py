@@ -3,58 +3,81 @@ from functools import partial
 
 from prompt_toolkit.validation import Validator
 from prompt_validators import OptionValidator, GeckoCodeValidator, DateValidator, IntValidator
-from pyRio.web_caching import CompleterCache
-from pyRio.api_manager import APIManager
-from pyRio.lookup import LookupDicts, Lookup
-
 from input_conversion import InputConverters
-
-manager = APIManager()
-cache = CompleterCache(manager)
+from lookup_tables import char_table, stadium_table
+from session import CacheSource
+
+users_source = CacheSource(lambda cache: cache.users())
+communities_source = CacheSource(lambda cache: cache.communities())
+tags_dictionary_source = CacheSource(lambda cache: cache.tags_dictionary())
+tag_names_source = CacheSource(lambda cache: list(cache.tags_dictionary().keys()))
+game_mode_dictionary_source = CacheSource(lambda cache: cache.game_mode_dictionary())
+game_mode_names_source = CacheSource(lambda cache: list(cache.game_mode_dictionary().keys()))
+game_mode_names_by_id_source = CacheSource(lambda cache: {v: k for k, v in cache.game_mode_dictionary().items()})
+# Not cache data, but resolving through a source keeps pyRio.lookup from loading until the prompt is shown
+char_names_source = CacheSource(lambda cache: char_table().names)
+stadium_names_source = CacheSource(lambda cache: stadium_table().names)
+
+# Validators over cache sources are shared so each list's membership set is only built once per generation
+_source_validators = {}
 
 class APIParameter:
     def __init__(
         self,
         prompt: str,
         arg_name: str,
-        completer: Optional[List[str]] = None,
-        validator: Optional[Union[Callable, List[str]]] = None,
+        completer: Optional[Union[List[str], CacheSource]] = None,
+        validator: Optional[Union[Callable, List[str], CacheSource]] = None,
         input_processing: Optional[Callable] = None,
         loop: bool = False,
         subparameters: Optional[dict] = None,
         multiline: bool = False,
         optional: bool = False,
-        data_params_dict: bool = False
+        data_params_dict: bool = False,
+        min_items: int = 0
     ):
         """
         Represents an individual API parameter used in prompts.
         Parameters:
         - prompt (str): The text that prompts the user for input.
         - arg_name (str): The name of the web_functions argument
-        - completer (Optional[Union[List[str], Callable]]): A list of valid options to complete input or a callable that returns a list.
-        - validator (Optional[Union[List[str], Callable]]): A list of valid options or a callable for input validation.
+        - completer (Optional[Union[List[str], CacheSource]]): A list of valid options to complete input or a CacheSource resolved on first prompt.
+        - validator (Optional[Union[List[str], Callable, CacheSource]]): A list of valid options, a CacheSource of valid options or a Validator.
         - input_processing (Optional[Callable]): A function to process the input before or after validation.
         - subparameters (Optional[dict]): A dictionary of subparameters that can be nested under the current parameter.
         - loop (bool): Whether to continue prompting for input in a loop.
         - multiline (bool): Whether the input should support multiple lines (for example, for code input).
+        - min_items (int): For looping parameters, the number of values that must be entered before the loop can end.
         """
         self.prompt = prompt
         self.arg_name = arg_name
         self.loop = loop
         self.optional = optional
-        self.completer = self._validate_completer(completer)
+        self._completer = self._validate_completer(completer)
         self.validator = self._process_validator(validator)
         self.input_processing = input_processing
         self.subparameters = subparameters or {}
         self.multiline = multiline
         self.data_params_dict = data_params_dict
+        self.min_items = min_items
 
-    def _validate_completer(self, completer: Optional[List[str]]) -> Optional[List[str]]:
+    @property
+    def completer(self) -> Optional[List[str]]:
         """
-        Ensures that the completer is always a list of strings.
+        The completion options, resolving a CacheSource against the current cache generation.
+        """
+        if isinstance(self._completer, CacheSource):
+            return self._completer()
+        return self._completer
+
+    def _validate_completer(self, completer: Optional[Union[List[str], CacheSource]]) -> Optional[Union[List[str], CacheSource]]:
+        """
+        Ensures that the completer is always a list of strings or a CacheSource.
         """
         if completer is None:
             return None
+        if isinstance(completer, CacheSource):
+            return completer.extended(['q']) if self.loop or self.optional else completer
         if not isinstance(completer, list):
             raise TypeError("Completer must be a list of strings.")
         if not all(isinstance(item, str) for item in completer):
@@ -63,10 +86,15 @@ class APIParameter:
             completer += ['q']
         return completer
 
-    def _process_validator(self, validator: Optional[Union[Callable, List[str]]]) -> Optional[Callable]:
+    def _process_validator(self, validator: Optional[Union[Callable, List[str], CacheSource]]) -> Optional[Callable]:
         """
-        Converts a list into an OptionValidator or validates if the input is callable.
+        Converts a list or CacheSource into an OptionValidator or validates if the input is callable.
         """
+        if isinstance(validator, CacheSource):
+            extra = ('q',) if self.loop or self.optional else ()
+            if (validator, extra) not in _source_validators:
+                _source_validators[(validator, extra)] = OptionValidator(validator, extra=extra)
+            return _source_validators[(validator, extra)]
         if isinstance(validator, list):
             if self.loop or self.optional:
                 validator += ['q']
@@ -86,8 +114,8 @@ community_name_free = APIParameter(
 community_name_closed = APIParameter(
     prompt='Enter the name of the community: ',
     arg_name = 'community_name_closed',
-    completer=cache.communities(),
-    validator=cache.communities()
+    completer=communities_source,
+    validator=communities_source
 )
 
 comm_type = APIParameter(
@@ -137,9 +165,10 @@ invite_list = APIParameter(
         'input': APIParameter(
             arg_name = None,
             prompt='Enter the Rio username to add to the community (q to finish): ',
-            completer=cache.users(),
-            validator=cache.users(),
-            loop=True
+            completer=users_source,
+            validator=users_source,
+            loop=True,
+            min_items=1
         ),
         'txt': APIParameter(
             prompt='Enter the path to the comma separated username .txt file: ',
@@ -158,18 +187,20 @@ community_manage_bans = APIParameter(
         'ban': APIParameter(
             prompt='Enter the Rio username to ban (q to finish): ',
             arg_name=None,
-            completer=cache.users(),
-            validator=cache.users(),
+            completer=users_source,
+            validator=users_source,
             input_processing=partial(InputConverters.community_manager_converter, ban=True),
-            loop=True
+            loop=True,
+            min_items=1
         ),
         'unban': APIParameter(
             prompt='Enter the Rio username to unban (q to finish): ',
             arg_name=None,
-            completer=cache.users(),
-            validator=cache.users(),
+            completer=users_source,
+            validator=users_source,
             input_processing=partial(InputConverters.community_manager_converter, ban=False),
-            loop=True
+            loop=True,
+            min_items=1
         )
     }
 )
@@ -178,16 +209,18 @@ community_remove_users = APIParameter(
     loop=True,
     arg_name = 'user_list',
     prompt='Enter the Rio username to remove (q to finish): ',
-    completer=cache.users(),
-    validator=cache.users(),
+    completer=users_source,
+    validator=users_source,
     input_processing=partial(InputConverters.community_manager_converter, remove=True),
+    min_items=1
 )
 
 community_remove_all_users = APIParameter(
-    arg_name = 'user_list',
-    prompt='Please confirm you would like to remove all users from this community: ',
+    arg_name = 'confirm',
+    prompt='Please confirm you would like to remove all users from this community (y/n): ',
+    completer=['y', 'n'],
     validator=['y', 'n'],
-    input_processing=InputConverters.remove_all_users_list
+    input_processing=InputConverters.yes_no_to_t_f
 )
 
 manage_user_community_keys = APIParameter(
@@ -199,18 +232,20 @@ manage_user_community_keys = APIParameter(
         'create': APIParameter(
             prompt='Enter the Rio username to create a key for (q to finish): ',
             arg_name='None',
-            completer=cache.users(),
-            validator=cache.users(),
+            completer=users_source,
+            validator=users_source,
             input_processing=partial(InputConverters.community_manager_converter, key=True),
-            loop=True
+            loop=True,
+            min_items=1
         ),
         'delete': APIParameter(
             prompt='Enter the Rio username to delete a key for (q to finish): ',
             arg_name='None',
-            completer=cache.users(),
-            validator=cache.users(),
+            completer=users_source,
+            validator=users_source,
             input_processing=partial(InputConverters.community_manager_converter, key=False),
-            loop=True
+            loop=True,
+            min_items=1
         )
     }
 )
@@ -224,18 +259,20 @@ manage_community_admins = APIParameter(
         'add': APIParameter(
             prompt='Enter the Rio username to make an admin (q to finish): ',
             arg_name='None',
-            completer=cache.users(),
-            validator=cache.users(),
+            completer=users_source,
+            validator=users_source,
             input_processing=partial(InputConverters.community_manager_converter, admin=True),
-            loop=True
+            loop=True,
+            min_items=1
         ),
         'remove': APIParameter(
             prompt='Enter the Rio username to remove as admin (q to finish): ',
             arg_name='None',
-            completer=cache.users(),
-            validator=cache.users(),
+            completer=users_source,
+            validator=users_source,
             input_processing=partial(InputConverters.community_manager_converter, admin=False),
             loop=True,
+            min_items=1
         )
     }
 )
@@ -255,8 +292,8 @@ tag_name_free = APIParameter(
 tag_name_closed = APIParameter(
     prompt='Enter the tag name: ',
     arg_name='tag_name_closed',
-    completer=list(cache.tags_dictionary().keys()),
-    validator=list(cache.tags_dictionary().keys())
+    completer=tag_names_source,
+    validator=tag_names_source
 )
 
 tag_desc = APIParameter(
@@ -310,36 +347,36 @@ end_date = APIParameter(
 add_tag_ids = APIParameter(
     prompt='Enter the tags to add to this community (optional): ',
     arg_name = 'add_tag_ids',
-    completer=list(cache.tags_dictionary().keys()),
-    validator=list(cache.tags_dictionary().keys()),
-    input_processing=partial(InputConverters.dictionary_conversion, dictionary=cache.tags_dictionary()),
+    completer=tag_names_source,
+    validator=tag_names_source,
+    input_processing=partial(InputConverters.dictionary_conversion, dictionary=tags_dictionary_source),
     loop=True
 )
 
 remove_tag_ids = APIParameter(
     prompt='Enter the tags to remove from this community (optional): ',
     arg_name = 'remove_tag_ids',
-    completer=list(cache.tags_dictionary().keys()),
-    validator=list(cache.tags_dictionary().keys()),
-    input_processing=partial(InputConverters.dictionary_conversion, dictionary=cache.tags_dictionary()),
+    completer=tag_names_source,
+    validator=tag_names_source,
+    input_processing=partial(InputConverters.dictionary_conversion, dictionary=tags_dictionary_source),
     loop=True
 )
 
 game_mode_to_mirror_tags_from = APIParameter(
     prompt='Enter the game mode to mirror tags from in this new game mode (q to skip): ',
     arg_name = 'game_mode_to_mirror_tags_from',
-    completer=list(cache.game_mode_dictionary().keys()),
-    validator=list(cache.game_mode_dictionary().keys()),
-    input_processing=partial(InputConverters.dictionary_conversion, dictionary=cache.game_mode_dictionary()),
+    completer=game_mode_names_source,
+    validator=game_mode_names_source,
+    input_processing=partial(InputConverters.dictionary_conversion, dictionary=game_mode_dictionary_source),
     optional=True
 )
 
 tag_set_id = APIParameter(
     prompt='Enter the name of the game mode: ',
     arg_name = 'tag_set_id',
-    completer=list(cache.game_mode_dictionary().keys()),
-    validator=list(cache.game_mode_dictionary().keys()),
-    input_processing=partial(InputConverters.dictionary_conversion, dictionary=cache.game_mode_dictionary())
+    completer=game_mode_names_source,
+    validator=game_mode_names_source,
+    input_processing=partial(InputConverters.dictionary_conversion, dictionary=game_mode_dictionary_source)
 )
 
 community_id = APIParameter(
@@ -351,16 +388,42 @@ community_id = APIParameter(
 game_mode_name_closed = APIParameter(
     prompt='Enter the name of the game mode: ',
     arg_name = 'game_mode_name_closed',
-    completer=list(cache.game_mode_dictionary().keys()),
-    validator=list(cache.game_mode_dictionary().keys())
+    completer=game_mode_names_source,
+    validator=game_mode_names_source
+)
+
+ladder_as_of = APIParameter(
+    prompt='Enter the date to compute the ladder as of (MM-DD-YYYY, q for today): ',
+    arg_name='as_of',
+    validator=DateValidator(extra=('q',)),
+    input_processing=partial(InputConverters.date_processing, eod=True),
+    optional=True
+)
+
+ladder_exclude_users = APIParameter(
+    prompt='Enter the username(s) whose games to leave out: ',
+    arg_name='exclude_users',
+    completer=users_source,
+    validator=users_source,
+    loop=True,
+    optional=True
+)
+
+ladder_players = APIParameter(
+    prompt='Enter the username(s) to only count games between: ',
+    arg_name='players',
+    completer=users_source,
+    validator=users_source,
+    loop=True,
+    optional=True
 )
 
 tag_id = APIParameter(
     prompt='Enter the name of the tag: ',
     arg_name = 'tag_id',
-    completer=list(cache.tags_dictionary().keys()),
-    validator=list(cache.tags_dictionary().keys()),
-    input_processing=partial(InputConverters.dictionary_conversion, dictionary=cache.tags_dictionary())
+    completer=tag_names_source,
+    validator=tag_names_source,
+    input_processing=partial(InputConverters.dictionary_conversion, dictionary=tags_dictionary_source)
 )
 
 tag_type = APIParameter(
@@ -378,14 +441,28 @@ game_id_dec = APIParameter(
 manual_submission_stat_file = APIParameter(
     prompt='Enter the path to the stat file of the game to submit: ',
     arg_name = '_dict',
-    input_processing=partial(InputConverters.stat_file_converter, cache_instance=cache)
+    input_processing=partial(InputConverters.stat_file_converter, tag_set_names=game_mode_names_by_id_source)
+)
+
+manual_submission_stat_files = APIParameter(
+    prompt='Enter a directory or glob of stat files to submit (e.g. stats/*.json): ',
+    arg_name = 'stat_files'
 )
 
 username = APIParameter(
     prompt = "Enter the player's username: ",
     arg_name='username',
-    completer = cache.users(),
-    validator = cache.users()
+    completer = users_source,
+    validator = users_source
+)
+
+usernames = APIParameter(
+    prompt = "Enter the player's username (q to finish): ",
+    arg_name='username',
+    completer = users_source,
+    validator = users_source,
+    loop=True,
+    min_items=1
 )
 
 user_group = APIParameter(
@@ -398,8 +475,8 @@ user_group = APIParameter(
 data_games_tag = APIParameter(
     prompt = 'Enter the tag name(s) to filter by: ',
     arg_name='tag',
-    completer=list(cache.game_mode_dictionary().keys()),
-    validator=list(cache.game_mode_dictionary().keys()),
+    completer=game_mode_names_source,
+    validator=game_mode_names_source,
     loop=True,
     optional=True
 )
@@ -407,8 +484,8 @@ data_games_tag = APIParameter(
 data_games_exclude_tag = APIParameter(
     prompt = 'Enter the tag name(s) to exclude: ',
     arg_name='exclude_tag',
-    completer=list(cache.game_mode_dictionary().keys()),
-    validator=list(cache.game_mode_dictionary().keys()),
+    completer=game_mode_names_source,
+    validator=game_mode_names_source,
     loop=True,
     optional=True
 )
@@ -416,8 +493,8 @@ data_games_exclude_tag = APIParameter(
 data_games_username = APIParameter(
     prompt='Enter the username(s) to filter by: ',
     arg_name='username',
-    completer=cache.users(),
-    validator=cache.users(),
+    completer=users_source,
+    validator=users_source,
     loop=True,
     optional=True
 )
@@ -425,8 +502,8 @@ data_games_username = APIParameter(
 data_games_vs_username = APIParameter(
     prompt='Enter the usernames(s) to filter opponents by: ',
     arg_name='vs_username',
-    completer=cache.users(),
-    validator=cache.users(),
+    completer=users_source,
+    validator=users_source,
     loop=True,
     optional=True
 )
@@ -434,16 +511,17 @@ data_games_vs_username = APIParameter(
 data_games_exclude_username = APIParameter(
     prompt='Enter the usernames(s) to exclude: ',
     arg_name='exclude_username',
-    completer=cache.users(),
-    validator=cache.users(),
+    completer=users_source,
+    validator=users_source,
     loop=True,
     optional=True
 )
 
-# Add completers
 data_games_captain = APIParameter(
     prompt='Enter the captain(s) to filter by: ',
     arg_name='captain',
+    completer=char_names_source,
+    validator=char_names_source,
     loop=True,
     optional=True
 )
@@ -451,6 +529,17 @@ data_games_captain = APIParameter(
 data_games_vs_captain = APIParameter(
     prompt='Enter the captain(s) to filter opponents by: ',
     arg_name='vs_captain',
+    completer=char_names_source,
+    validator=char_names_source,
+    loop=True,
+    optional=True
+)
+
+data_games_exclude_captain = APIParameter(
+    prompt='Enter the captain(s) to exclude: ',
+    arg_name='exclude_captain',
+    completer=char_names_source,
+    validator=char_names_source,
     loop=True,
     optional=True
 )
@@ -458,6 +547,8 @@ data_games_vs_captain = APIParameter(
 data_games_stadium = APIParameter(
     prompt='Enter the stadium(s) to filter by: ',
     arg_name='stadium',
+    completer=stadium_names_source,
+    validator=stadium_names_source,
     loop=True,
     optional=True
 )
@@ -468,6 +559,26 @@ data_games_limit_games = APIParameter(
     optional=True
 )
 
+data_games_export_format = APIParameter(
+    prompt='Enter the export format (csv, jsonl, parquet): ',
+    arg_name='export_format',
+    completer=['csv', 'jsonl', 'parquet'],
+    validator=['csv', 'jsonl', 'parquet']
+)
+
+data_games_page_size = APIParameter(
+    prompt='Enter the number of games to request per page (q for 500): ',
+    arg_name='page_size',
+    validator=IntValidator(extra=('q',)),
+    optional=True
+)
+
+data_games_resume_path = APIParameter(
+    prompt='Enter the path of an export to resume, the format and filters that follow then do not apply (q to start a new export): ',
+    arg_name='resume_path',
+    optional=True
+)
+
 game_mode_limit = APIParameter(
     prompt='Enter the new active tag set limit: ',
     arg_name='active_tag_set_limit',
@@ -486,10 +597,10 @@ data_stats_game_ids = APIParameter(
 data_stats_character = APIParameter(
     prompt='Enter the name of the characters to filter by: ',
     arg_name='char_id',
-    completer=list(LookupDicts.CHAR_NAME.values()),
+    completer=char_names_source,
     optional=True,
     loop=True,
-    input_processing=partial(Lookup().lookup, LookupDicts.CHAR_NAME)
+    input_processing=InputConverters.char_name_to_id
 )
 
 data_stats_by_user = APIParameter(
@@ -559,7 +670,7 @@ data_games_stats_endpoint_params = APIParameter(
         'exclude username',
         'captain',
         'vs. captain',
-        #exclude captain
+        'exclude captain',
         'stadium',
         'limit games',
         'game ids',
@@ -580,7 +691,7 @@ data_games_stats_endpoint_params = APIParameter(
         'exclude username': data_games_exclude_username,
         'captain': data_games_captain,
         'vs. captain': data_games_vs_captain,
-        #exclude captain
+        'exclude captain': data_games_exclude_captain,
         'stadium': data_games_stadium,
         'limit games': data_games_limit_games,
         'game ids': data_stats_game_ids,
@@ -596,4 +707,21 @@ data_games_stats_endpoint_params = APIParameter(
     },
     loop=True,
     data_params_dict=True
-)
\ No newline at end of file
+)
+
+stats_fanout_tag_sets = APIParameter(
+    prompt='Enter a tag set to compare (q to finish): ',
+    arg_name='tag_sets',
+    completer=game_mode_names_source,
+    validator=game_mode_names_source,
+    loop=True,
+    optional=True
+)
+
+stats_fanout_username_groups = APIParameter(
+    prompt='Enter a group of usernames to compare, separated by commas (q to finish): ',
+    arg_name='username_groups',
+    loop=True,
+    optional=True,
+    input_processing=InputConverters.split_usernames
+)
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from pyRio.api_manager import APIManager
+from connection_pool import DEFAULT_POOL_SIZE
+from lazy_imports import lazy_import
+
+web_func = lazy_import('pyRio.web_functions')
+
+
+class AsyncRioClient:
+    def __init__(self, manager: APIManager, max_workers: int = DEFAULT_POOL_SIZE):
+        """
+        Awaitable versions of the pyRio web functions.
+
+        Each web function attribute, e.g. client.community_manage, returns a coroutine function that
+        takes the same arguments minus api_manager. pyRio's functions are synchronous, so calls run on
+        a pool of max_workers threads sharing the manager's keep-alive session, and up to max_workers
+        round-trips overlap.
+
+        Parameters:
+        - manager (APIManager): The API manager used for every call.
+        - max_workers (int): The maximum number of calls running at once.
+        """
+        self.manager = manager
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created on first call so a client that is never awaited starts no threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='rio-client')
+            return self._executor
+
+    async def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Runs a blocking function in the client's pool and awaits its result.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), partial(func, *args, **kwargs))
+
+    def __getattr__(self, name: str):
+        func = getattr(web_func, name)
+
+        async def web_function(*args, **kwargs):
+            return await self.call(func, *args, api_manager=self.manager, **kwargs)
+
+        web_function.__name__ = name
+        return web_function
+
+    async def gather(self, name: str, kwargs_list: List[Dict], return_exceptions: bool = True) -> List[Any]:
+        """
+        Calls the named web function once per kwargs dict concurrently.
+
+        Returns:
+            List[Any]: The results in input order, with exceptions in place of failed calls by default.
+        """
+        web_function = getattr(self, name)
+        return await asyncio.gather(*(web_function(**kwargs) for kwargs in kwargs_list), return_exceptions=return_exceptions)
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,105 @@
+import json
+import os
+from typing import Any, Dict, List, Tuple
+
+from comm_manager_functions import FunctionHandler, function_groups
+from function_executer import ArgumentProcessor, print_result
+from session import RioSession
+
+
+def parse_arg(text: str) -> Tuple[str, Any]:
+    """
+    Splits a NAME=VALUE command line argument. VALUE is read as JSON when possible so lists
+    and subparameter dicts can be given inline, otherwise it is kept as a string.
+    """
+    name, separator, value = text.partition('=')
+    if not separator:
+        raise ValueError(f'Arguments must look like NAME=VALUE, got {text!r}')
+    try:
+        return name, json.loads(value)
+    except json.JSONDecodeError:
+        return name, value
+
+
+def load_batch_file(path: str) -> List[Dict]:
+    """
+    Reads a JSON or YAML batch file holding a list of operations, or a dict with an 'operations' list.
+    Each operation has a 'group', a 'function' and optional 'args' keyed by arg_name.
+    """
+    with open(path) as f:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError('PyYAML is required for YAML batch files, use JSON or pip install pyyaml') from e
+            batch = yaml.safe_load(f)
+        else:
+            batch = json.load(f)
+
+    operations = batch['operations'] if isinstance(batch, dict) else batch
+    if not isinstance(operations, list):
+        raise ValueError(f'{path} must contain a list of operations')
+    return operations
+
+
+def find_handler(group: str, function: str) -> FunctionHandler:
+    if group not in function_groups:
+        raise ValueError(f'Unknown group {group!r}. Valid groups are: {", ".join(function_groups)}')
+    if function not in function_groups[group]:
+        raise ValueError(f'Unknown function {function!r} in {group}. Valid functions are: {", ".join(function_groups[group])}')
+    return function_groups[group][function]
+
+
+def run_operation(session: RioSession, group: str, function: str, values: Dict[str, Any]):
+    """
+    Validates the values against the handler's inputs and runs it.
+
+    Returns:
+        The parsed output of the handler, or None if it has no parse_data function.
+    """
+    handler = find_handler(group, function)
+    function_args = ArgumentProcessor().gather_function_args(handler.inputs, values)
+    return handler.execute(function_args, session)
+
+
+def run_batch(session: RioSession, operations: List[Dict], stop_on_error: bool = False) -> List[Dict]:
+    """
+    Runs each operation in order in this process, sharing the session's warm cache.
+
+    Returns:
+        List[Dict]: One report row per operation attempted, with its status and any error.
+    """
+    report = []
+    for index, operation in enumerate(operations, start=1):
+        group, function = operation.get('group'), operation.get('function')
+        print(f'[{index}/{len(operations)}] {group}: {function}')
+        try:
+            print_result(run_operation(session, group, function, operation.get('args') or {}))
+            report.append({'operation': index, 'group': group, 'function': function, 'status': 'ok', 'error': ''})
+        except Exception as e:
+            print(f'    Failed: {e}')
+            report.append({'operation': index, 'group': group, 'function': function, 'status': 'failed', 'error': str(e)})
+            if stop_on_error:
+                break
+    return report
+
+
+def main(session: RioSession, args) -> int:
+    """
+    Entry point for the run and batch commands.
+
+    Returns:
+        int: The process exit code, non-zero if any operation failed.
+    """
+    if args.command == 'run':
+        values = dict(parse_arg(arg) for arg in args.arg)
+        operations = [{'group': args.group, 'function': args.function, 'args': values}]
+        stop_on_error = False
+    else:
+        operations = load_batch_file(args.batch_file)
+        stop_on_error = args.stop_on_error
+
+    report = run_batch(session, operations, stop_on_error=stop_on_error)
+    failed = [row for row in report if row['status'] == 'failed']
+    print(f'\n{len(report) - len(failed)} succeeded, {len(failed)} failed')
+    return 1 if failed else 0
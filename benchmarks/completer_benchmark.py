@@ -0,0 +1,58 @@
+"""
+Compares per-keystroke completion latency of prompt_toolkit's FuzzyCompleter and completers.IndexedCompleter.
+
+Run from the repository root:
+    python benchmarks/completer_benchmark.py
+"""
+import os
+import random
+import string
+import sys
+import time
+from itertools import islice
+
+from prompt_toolkit.completion import CompleteEvent, FuzzyCompleter, WordCompleter
+from prompt_toolkit.document import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from completers import IndexedCompleter
+
+SIZES = [1_000, 10_000, 100_000]
+QUERIES = ['m', 'ma', 'mar', 'mari', 'mario', 'xq', 'oir']
+MAX_RESULTS = 50
+
+
+def make_usernames(count, seed=0):
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + '_'
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(4, 16))) for _ in range(count)]
+
+
+def keystroke_latency(completer, query, repeats):
+    document = Document(query)
+    event = CompleteEvent(text_inserted=True)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        list(islice(completer.get_completions(document, event), MAX_RESULTS))
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    print(f'{"entries":>8} {"query":>6} {"fuzzy ms":>10} {"indexed ms":>11}')
+    for size in SIZES:
+        words = make_usernames(size)
+        fuzzy = FuzzyCompleter(WordCompleter(words, ignore_case=True))
+
+        start = time.perf_counter()
+        indexed = IndexedCompleter(words, max_results=MAX_RESULTS)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        repeats = max(1, 10_000 // size)
+        for query in QUERIES:
+            print(f'{size:>8} {query:>6} {keystroke_latency(fuzzy, query, repeats):>10.2f} '
+                  f'{keystroke_latency(indexed, query, repeats * 10):>11.3f}')
+        print(f'{size:>8} index build: {build_ms:.1f} ms\n')
+
+
+if __name__ == '__main__':
+    main()
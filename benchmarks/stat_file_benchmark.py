@@ -0,0 +1,124 @@
+"""
+Compares reading the submission fields of Rio stat files with a full json.load, a full orjson parse
+(when orjson is installed) and stat_file_loader.load_stat_file_header.
+
+A corpus of synthetic stat files with a Rio-style header, per-character stats and per-event arrays
+is written to a temporary directory. Run from the repository root:
+    python benchmarks/stat_file_benchmark.py
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stat_file_loader import HEADER_FIELDS, load_stat_file_header
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FILE_COUNT = 200
+EVENT_COUNTS = [100, 400]
+REPEATS = 3
+
+
+def synthetic_stat_file(game_id: int, event_count: int) -> dict:
+    rng = random.Random(game_id)
+    return {
+        'GameID': f'{rng.getrandbits(40):,}',
+        'Date - Start': 'Sat Jan 06 19:40:00 2024',
+        'Date - End': 'Sat Jan 06 20:15:00 2024',
+        'Ranked': 1,
+        'Netplay': 1,
+        'StadiumID': 'Mario Stadium',
+        'Away Player': f'user{rng.randrange(1000)}',
+        'Home Player': f'user{rng.randrange(1000)}',
+        'Away Score': rng.randrange(10),
+        'Home Score': rng.randrange(10),
+        'Innings Selected': 9,
+        'Innings Played': 9,
+        'TagSetID': rng.randrange(1, 50),
+        'Character Game Stats': {
+            f'Team {team} Roster {slot}': {
+                'Team': team,
+                'RosterID': slot,
+                'CharID': rng.choice(['Mario', 'Luigi', 'Peach', 'Bowser', 'Yoshi']),
+                'Defensive Stats': {stat: rng.randrange(100) for stat in ('Batters Faced', 'Runs Allowed', 'Strikeouts', 'Outs Pitched')},
+                'Offensive Stats': {stat: rng.randrange(10) for stat in ('At Bats', 'Hits', 'Singles', 'Doubles', 'Homeruns', 'RBI')},
+            } for team in range(2) for slot in range(9)
+        },
+        'Events': [{
+            'Event Num': event,
+            'Inning': event // 40 + 1,
+            'Half Inning': event % 2,
+            'Away Score': rng.randrange(10),
+            'Home Score': rng.randrange(10),
+            'Balls': rng.randrange(4),
+            'Strikes': rng.randrange(3),
+            'Outs': rng.randrange(3),
+            'Pitch': {
+                'Pitcher Team Id': rng.randrange(2),
+                'Pitch Type': rng.choice(['Curve', 'Charge', 'ChangeUp']),
+                'Ball Position - X': rng.random(),
+                'Ball Position - Z': rng.random(),
+                'Contact': {'Type of Contact': 'Nice', 'Ball Velocity - X': rng.random(), 'Ball Velocity - Y': rng.random(),
+                            'Ball Landing Position - X': rng.random(), 'Ball Landing Position - Z': rng.random()},
+            },
+        } for event in range(event_count)],
+    }
+
+
+def json_loader(path):
+    with open(path) as f:
+        stat_file = json.load(f)
+    return {field: stat_file[field] for field in HEADER_FIELDS}
+
+
+def orjson_loader(path):
+    with open(path, 'rb') as f:
+        stat_file = orjson.loads(f.read())
+    return {field: stat_file[field] for field in HEADER_FIELDS}
+
+
+def timed(loader, paths):
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for path in paths:
+            loader(path)
+        best = min(best, time.perf_counter() - start)
+    return best / len(paths) * 1000
+
+
+def main():
+    loaders = [('json.load', json_loader)]
+    if orjson is not None:
+        loaders.append(('orjson', orjson_loader))
+    loaders.append(('header', load_stat_file_header))
+
+    print(f'{"events":>7} {"avg KB":>7} ' + ' '.join(f'{name + " ms":>12}' for name, _ in loaders))
+    for event_count in EVENT_COUNTS:
+        with tempfile.TemporaryDirectory() as corpus:
+            paths = []
+            for game_id in range(FILE_COUNT):
+                path = os.path.join(corpus, f'game_{game_id}.json')
+                with open(path, 'w') as f:
+                    json.dump(synthetic_stat_file(game_id, event_count), f, indent=4)
+                paths.append(path)
+
+            expected = [json_loader(path) for path in paths]
+            for name, loader in loaders:
+                assert [loader(path) for path in paths] == expected, f'{name} read different fields'
+
+            average_kb = sum(os.path.getsize(path) for path in paths) / len(paths) / 1024
+            timings = [timed(loader, paths) for _, loader in loaders]
+            print(f'{event_count:>7} {average_kb:>7.0f} ' + ' '.join(f'{timing:>12.3f}' for timing in timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Compares joining usernames onto a community member list with the previous per-call merge
+against the shared id -> username Series used by data_parsing.index_by_username.
+
+Run from the repository root:
+    python benchmarks/user_lookup_benchmark.py
+"""
+import random
+import time
+
+import pandas as pd
+
+USER_COUNTS = [10_000, 100_000]
+MEMBER_COUNTS = [10, 2_000]
+REPEATS = 20
+
+
+def merge_join(users_dictionary, members):
+    df2 = pd.DataFrame(list(users_dictionary.items()), columns=['user_id', 'username'])
+    df2['user_id'] = pd.to_numeric(df2['user_id'])
+    return pd.DataFrame(members).merge(df2, on='user_id', how='left').set_index('username')
+
+
+def map_join(usernames_by_id, members):
+    df = pd.DataFrame(members)
+    return df.set_index(df['user_id'].map(usernames_by_id).rename('username'))
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        func(*args)
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+def main():
+    print(f'{"users":>8} {"members":>8} {"merge ms":>9} {"map ms":>7}')
+    for user_count in USER_COUNTS:
+        users_dictionary = {str(user_id): f'user{user_id}' for user_id in range(1, user_count + 1)}
+        start = time.perf_counter()
+        usernames_by_id = pd.Series(list(users_dictionary.values()),
+                                    index=pd.to_numeric(pd.Index(list(users_dictionary.keys()))))
+        build_ms = (time.perf_counter() - start) * 1000
+
+        for member_count in MEMBER_COUNTS:
+            members = [{'user_id': random.randint(1, user_count), 'date_joined': 0} for _ in range(member_count)]
+            assert merge_join(users_dictionary, members).index.equals(map_join(usernames_by_id, members).index)
+            print(f'{user_count:>8} {member_count:>8} {timed(merge_join, users_dictionary, members):>9.2f} '
+                  f'{timed(map_join, usernames_by_id, members):>7.2f}')
+        print(f'{user_count:>8} lookup build (once per cache generation): {build_ms:.1f} ms\n')
+
+
+if __name__ == '__main__':
+    main()
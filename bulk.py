@@ -0,0 +1,181 @@
+import asyncio
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from async_client import AsyncRioClient
+from session import get_session
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def status_code(error: Exception) -> Optional[int]:
+    """
+    Returns the HTTP status code carried by a request error, if any.
+    """
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+def is_retryable(error: Exception) -> bool:
+    code = status_code(error)
+    if code is not None:
+        return code in RETRY_STATUS_CODES
+    # Connection resets and timeouts carry no response and are worth another try
+    return isinstance(error, (ConnectionError, TimeoutError)) or type(error).__name__ in ('ConnectionError', 'Timeout', 'ReadTimeout')
+
+
+def describe_item(item: Any) -> str:
+    """
+    Returns a short label for an item, using the username of community_manage style dicts.
+    """
+    if isinstance(item, dict) and 'username' in item:
+        return str(item['username'])
+    return str(item)
+
+
+class BulkResult:
+    def __init__(self, item: Any, output: Any = None, error: Optional[Exception] = None, attempts: int = 1):
+        self.item = item
+        self.output = output
+        self.error = error
+        self.attempts = attempts
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class BulkReport:
+    def __init__(self, results: List[BulkResult], elapsed: float):
+        """
+        The outcome of a bulk run, in the order the items were given.
+        """
+        self.results = results
+        self.elapsed = elapsed
+
+    @property
+    def succeeded(self) -> List[BulkResult]:
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> List[BulkResult]:
+        return [result for result in self.results if not result.ok]
+
+    def to_dataframe(self):
+        import pandas as pd
+
+        return pd.DataFrame([{
+            'item': describe_item(result.item),
+            'status': 'ok' if result.ok else 'failed',
+            'attempts': result.attempts,
+            'error': '' if result.ok else str(result.error),
+        } for result in self.results])
+
+    def __str__(self):
+        summary = f'{len(self.succeeded)} succeeded, {len(self.failed)} failed in {self.elapsed:.1f}s'
+        return f'{self.to_dataframe().to_string(index=False)}\n{summary}'
+
+
+class BulkExecutor:
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        show_progress: bool = True,
+        client: Optional[AsyncRioClient] = None
+    ):
+        """
+        Runs one call per item through an AsyncRioClient, at most max_workers at once, retrying rate limited and server errors.
+
+        Parameters:
+        - max_workers (int): The maximum number of calls in flight at once, also bounded by the client's pool.
+        - retries (int): How many times a retryable failure is retried per item.
+        - backoff (float): Seconds to wait before the first retry, doubled on each further retry.
+        - show_progress (bool): Whether to show a progress bar while running.
+        - client (Optional[AsyncRioClient]): The client the calls are awaited on, the session's client if not supplied.
+        """
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.show_progress = show_progress
+        self.client = client
+
+    def _call(self, func: Callable, item: Any, kwargs: Dict) -> BulkResult:
+        for attempt in range(1, self.retries + 2):
+            try:
+                return BulkResult(item, output=func(**kwargs), attempts=attempt)
+            except Exception as e:
+                if attempt > self.retries or not is_retryable(e):
+                    return BulkResult(item, error=e, attempts=attempt)
+                retry_after = getattr(getattr(e, 'response', None), 'headers', {}).get('Retry-After')
+                time.sleep(float(retry_after) if retry_after and retry_after.isdigit() else self.backoff * 2 ** (attempt - 1))
+
+    def run(self, func: Callable, items: List[Any], build_kwargs: Callable[[Any], Dict], label: str = '') -> BulkReport:
+        """
+        Calls func once per item with the keyword arguments built for that item, blocking until every call is done.
+
+        Args:
+            func (Callable): The web function to call.
+            items (List[Any]): The items to process.
+            build_kwargs (Callable[[Any], Dict]): Builds the call's keyword arguments from an item.
+            label (str): Text shown next to the progress bar.
+
+        Returns:
+            BulkReport: The result of every item, in input order.
+        """
+        return asyncio.run(self.run_async(func, items, build_kwargs, label))
+
+    async def run_async(self, func: Callable, items: List[Any], build_kwargs: Callable[[Any], Dict], label: str = '') -> BulkReport:
+        """
+        Awaitable version of run, for callers already inside an event loop.
+        """
+        if self.client is None:
+            self.client = get_session().async_client
+
+        start = time.perf_counter()
+        results: List[Optional[BulkResult]] = [None] * len(items)
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def call(index: int, item: Any):
+            async with semaphore:
+                return index, await self.client.call(self._call, func, item, build_kwargs(item))
+
+        with self._progress(len(items), label) as advance:
+            for completed in asyncio.as_completed([call(index, item) for index, item in enumerate(items)]):
+                index, result = await completed
+                results[index] = result
+                advance()
+        return BulkReport(results, time.perf_counter() - start)
+
+    @contextmanager
+    def _progress(self, total: int, label: str):
+        """
+        Yields a function to call as each item completes, which updates the progress bar or log.
+        """
+        if not self.show_progress or not total:
+            yield lambda: None
+        elif sys.stdout.isatty():
+            from prompt_toolkit.shortcuts import ProgressBar
+
+            with ProgressBar(title=label or None) as progress_bar:
+                counter = progress_bar(total=total)
+                yield counter.item_completed
+                counter.done = True
+        else:
+            # Without a terminal, log roughly every 10% so cron and CI output stays readable
+            step = max(1, total // 10)
+            count = 0
+
+            def advance():
+                nonlocal count
+                count += 1
+                if count % step == 0 or count == total:
+                    print(f'{label} {count}/{total}'.strip())
+
+            yield advance
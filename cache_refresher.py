@@ -0,0 +1,86 @@
+import threading
+import time
+from typing import List, Optional, Set
+
+from cache_snapshot import SnapshotCache, GROUP_OF_RESOURCE
+
+DEFAULT_REFRESH_INTERVAL = 15 * 60
+
+
+class BackgroundRefresher:
+    def __init__(self, cache: SnapshotCache, interval: float = DEFAULT_REFRESH_INTERVAL):
+        """
+        Refreshes the cache on a daemon thread so the prompt never waits on RioWeb.
+
+        On start, stale resources are revalidated. After that every loaded resource is refreshed each
+        interval, and requested groups are refreshed as soon as possible. Fetched lists are swapped into
+        the cache in one step, so completers keep serving the previous lists until the new ones are ready.
+
+        Parameters:
+        - cache (SnapshotCache): The cache to refresh.
+        - interval (float): Seconds between timed refreshes of everything loaded.
+        """
+        self.cache = cache
+        self.interval = interval
+        self.refreshing = False
+        self.last_error: Optional[Exception] = None
+        self._pending: Set[str] = set()
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='cache-refresher', daemon=True)
+
+    def start(self):
+        stale_groups = {GROUP_OF_RESOURCE[name] for name in self.cache.stale_resources() if name in self.cache.loaded_resources()}
+        if stale_groups:
+            self.request(list(stale_groups))
+        self._thread.start()
+
+    def request(self, resources: Optional[List[str]] = None):
+        """
+        Queues resource groups for refresh, or everything loaded if none are given, and wakes the thread.
+        """
+        with self._pending_lock:
+            self._pending |= set(resources) if resources is not None else {GROUP_OF_RESOURCE[name] for name in self.cache.loaded_resources()}
+        self._wake.set()
+
+    def _run(self):
+        next_timed_refresh = time.monotonic() + self.interval
+        while True:
+            self._wake.wait(timeout=max(0.0, next_timed_refresh - time.monotonic()))
+            self._wake.clear()
+
+            if time.monotonic() >= next_timed_refresh:
+                self.request()
+                self._wake.clear()
+                next_timed_refresh = time.monotonic() + self.interval
+
+            with self._pending_lock:
+                resources, self._pending = sorted(self._pending), set()
+            if not resources:
+                continue
+
+            self.refreshing = True
+            try:
+                self.cache.refresh_cache(resources, verbose=False)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+            finally:
+                self.refreshing = False
+
+    def status(self) -> str:
+        """
+        A short status for the prompt, e.g. "cache refreshing" or "cache age 42s".
+        """
+        if self.refreshing:
+            return 'cache refreshing'
+        if self.last_error is not None:
+            return 'cache refresh failed'
+        age = self.cache.age()
+        if age is None:
+            return 'cache empty'
+        if age < 60:
+            return f'cache age {age:.0f}s'
+        if age < 60 * 60:
+            return f'cache age {age / 60:.0f}m'
+        return f'cache age {age / 3600:.1f}h'
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+from pyRio.api_manager import APIManager
+from async_client import AsyncRioClient
+from lazy_imports import lazy_import
+
+if TYPE_CHECKING:
+    from pyRio.web_caching import CompleterCache
+
+# pyRio's CompleterCache pulls in pandas, so it is only loaded once RioWeb actually has to be queried
+web_caching = lazy_import('pyRio.web_caching')
+
+SNAPSHOT_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'riowebcli')
+DEFAULT_TTL = 6 * 60 * 60
+
+
+def _tags_df_to_json(cache: CompleterCache) -> str:
+    return cache.return_tags_df().to_json(orient='split')
+
+
+# Each resource kept in the snapshot, and how to read it from a live pyRio CompleterCache
+RESOURCE_LOADERS: Dict[str, Callable[[CompleterCache], Any]] = {
+    'users': lambda cache: cache.users(),
+    'users_dictionary': lambda cache: cache.users_dictionary(),
+    'communities': lambda cache: cache.communities(),
+    'tags_dictionary': lambda cache: cache.tags_dictionary(),
+    'game_mode_dictionary': lambda cache: cache.game_mode_dictionary(),
+    'tags_df': _tags_df_to_json,
+}
+
+# Resources read from the same RioWeb list, fetched and refreshed together
+RESOURCE_GROUPS: Dict[str, List[str]] = {
+    'users': ['users', 'users_dictionary'],
+    'communities': ['communities'],
+    'tags': ['tags_dictionary', 'tags_df'],
+    'game_modes': ['game_mode_dictionary'],
+}
+GROUP_OF_RESOURCE = {name: group for group, names in RESOURCE_GROUPS.items() for name in names}
+
+
+class SnapshotCache:
+    def __init__(
+        self,
+        manager: APIManager,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        ttl: float = DEFAULT_TTL,
+        offline: bool = False
+    ):
+        """
+        A CompleterCache backed by a versioned JSON snapshot on disk.
+
+        The snapshot is loaded at startup so the menu never waits on RioWeb. Resources older than
+        the TTL are reported by stale_resources() for revalidation. In offline mode the snapshot is
+        trusted as-is and RioWeb is never contacted.
+
+        Parameters:
+        - manager (APIManager): The API manager used to fetch from RioWeb.
+        - cache_dir (str): The directory holding the snapshot file.
+        - ttl (float): Seconds before a snapshot resource is considered stale.
+        - offline (bool): Whether to only serve the snapshot.
+        """
+        self.manager = manager
+        self.path = os.path.join(cache_dir, 'completer_cache.json')
+        self.ttl = ttl
+        self.offline = offline
+        self.generation = 0
+        self._resources: Dict[str, dict] = self._load_snapshot()
+        self._lock = threading.Lock()
+        # Its own client rather than the session's, so a refresh never waits behind a bulk run's calls
+        self._client = AsyncRioClient(manager, max_workers=len(RESOURCE_GROUPS))
+
+    def _load_snapshot(self) -> Dict[str, dict]:
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            return {}
+        return snapshot['resources']
+
+    def _save_snapshot(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'version': SNAPSHOT_VERSION, 'resources': self._resources}, f, separators=(',', ':'))
+        os.replace(temp_path, self.path)
+
+    def _fetch_group(self, group: str) -> Dict[str, dict]:
+        # A fresh CompleterCache only requests the lists that are read from it
+        source = web_caching.CompleterCache(self.manager)
+        fetched_at = time.time()
+        return {name: {'fetched_at': fetched_at, 'value': RESOURCE_LOADERS[name](source)} for name in RESOURCE_GROUPS[group]}
+
+    def _fetch(self, names: Iterable[str]) -> Dict[str, dict]:
+        """
+        Reads the groups holding the named resources from RioWeb, one concurrent request per group.
+        """
+        groups = sorted({GROUP_OF_RESOURCE[name] for name in names})
+        if len(groups) == 1:
+            return self._fetch_group(groups[0])
+        return asyncio.run(self._fetch_groups(groups))
+
+    async def _fetch_groups(self, groups: List[str]) -> Dict[str, dict]:
+        fetched = {}
+        for group_resources in await asyncio.gather(*(self._client.call(self._fetch_group, group) for group in groups)):
+            fetched |= group_resources
+        return fetched
+
+    def _merge(self, fetched: Dict[str, dict]) -> List[str]:
+        """
+        Swaps fetched resources into the snapshot and returns the names whose values changed.
+        """
+        with self._lock:
+            changed = [name for name, entry in fetched.items()
+                       if self._resources.get(name, {}).get('value') != entry['value']]
+            self._resources = self._resources | fetched
+            if changed:
+                self.generation += 1
+            self._save_snapshot()
+        return changed
+
+    def stale_resources(self) -> List[str]:
+        now = time.time()
+        return [name for name in RESOURCE_LOADERS
+                if name not in self._resources or now - self._resources[name]['fetched_at'] > self.ttl]
+
+    def age(self) -> Optional[float]:
+        """
+        Returns the age in seconds of the oldest resource in the snapshot, or None if it is empty.
+        """
+        if not self._resources:
+            return None
+        return time.time() - min(entry['fetched_at'] for entry in self._resources.values())
+
+    def loaded_resources(self) -> List[str]:
+        return list(self._resources)
+
+    def _get(self, name: str) -> Any:
+        if name not in self._resources:
+            if self.offline:
+                raise RuntimeError(f'No cached {name} available in offline mode, run once online first')
+            self._merge(self._fetch([name]))
+        return self._resources[name]['value']
+
+    def refresh_cache(self, resources: Optional[Iterable[str]] = None, verbose: bool = True) -> List[str]:
+        """
+        Refetches the given resources or resource groups (users, communities, tags, game_modes) and merges them
+        into the snapshot. Everything already loaded is refreshed by default, with each group fetched concurrently.
+        Only a change in value bumps the generation, so unchanged lists keep their completers and indexes.
+
+        Returns:
+            List[str]: The names of the resources whose values changed.
+        """
+        if self.offline:
+            if verbose:
+                print('Offline mode: serving the cached snapshot without refreshing')
+            return []
+        if resources is None:
+            names = list(self._resources) or list(RESOURCE_LOADERS)
+        else:
+            names = [name for resource in resources for name in RESOURCE_GROUPS.get(resource, [resource])]
+        changed = self._merge(self._fetch(names))
+        if verbose:
+            print(f'Cache updated ({", ".join(changed) if changed else "no changes"})')
+        return changed
+
+    def users(self) -> List[str]:
+        return self._get('users')
+
+    def users_dictionary(self) -> Dict[str, str]:
+        return self._get('users_dictionary')
+
+    def communities(self) -> List[str]:
+        return self._get('communities')
+
+    def tags_dictionary(self) -> Dict[str, int]:
+        return self._get('tags_dictionary')
+
+    def game_mode_dictionary(self) -> Dict[str, int]:
+        return self._get('game_mode_dictionary')
+
+    def return_tags_df(self):
+        from io import StringIO
+        import pandas as pd
+
+        return pd.read_json(StringIO(self._get('tags_df')), orient='split')
@@ -1,14 +1,18 @@
-from typing import List, Optional, Callable
+from typing import List, Optional, Callable, Union
 import pyRio.web_functions as web_func
 import local_functions
 import api_parameters as param
 import data_parsing
+import games_export
+import stat_file_submission
+import community_removal
+import ladder
+import game_warehouse
+import query_planner
+import stats_fanout
 from functools import partial
-from pyRio.api_manager import APIManager
-from pyRio.web_caching import CompleterCache
-
-manager = APIManager()
-cache = CompleterCache(manager)
+from session import CacheSource, RioSession
+from bulk import BulkExecutor
 
 class FunctionHandler:
     def __init__(
@@ -17,7 +21,9 @@ class FunctionHandler:
         inputs: List[param.APIParameter],
         parse_data: Optional[Callable] = None,
         constant_inputs: Optional[dict] = None,
-        refresh_cache: bool = False
+        refresh_cache: Union[bool, List[str]] = False,
+        bulk_input: Optional[str] = None,
+        bulk_item_list: bool = True
     ):
         """
         Represents a handler for a specific function.
@@ -26,13 +32,82 @@ class FunctionHandler:
         - func (Callable): The function to execute.
         - inputs (List[APIParameter]): A list of input parameters required for the function.
         - parse_data (Optional[Callable]): A function to parse the output data.
-        - constant_inputs (Optional[dict]): A dictionary of fixed inputs to supply to the function.
+        - constant_inputs (Optional[dict]): A dictionary of fixed inputs to supply to the function. CacheSource values are resolved when the function runs.
+        - refresh_cache (Union[bool, List[str]]): The cache groups (users, communities, tags, game_modes) the function changes
+          and that are refreshed after it runs, or True to refresh the whole cache.
+        - bulk_input (Optional[str]): The list argument to fan out over concurrently, one call per item, when it holds more than one item.
+          An empty list skips the call.
+        - bulk_item_list (bool): Whether each call receives its item wrapped in a list or as a single value, including a lone item.
         """
         self.func = func
         self.inputs = inputs
         self.parse_data = parse_data
         self.constant_inputs = constant_inputs or {}
         self.refresh_cache = refresh_cache
+        self.bulk_input = bulk_input
+        self.bulk_item_list = bulk_item_list
+
+    def resolve_constant_inputs(self) -> dict:
+        """
+        Returns the constant inputs with any CacheSource values read from the current cache.
+        """
+        return {key: value() if isinstance(value, CacheSource) else value for key, value in self.constant_inputs.items()}
+
+    def execute(self, function_args: dict, session: RioSession):
+        """
+        Runs the function with the gathered arguments and the session's API manager, then parses the output.
+
+        Returns:
+            The parsed output, or None if the handler has no parse_data function.
+        """
+        function_args = function_args | {'api_manager': session.manager}
+
+        if self.constant_inputs:
+            function_args = function_args | self.resolve_constant_inputs()
+
+        if self.bulk_input:
+            items = function_args.get(self.bulk_input) or []
+            if not items:
+                print(f'Nothing to do, no values were entered for {self.bulk_input}')
+                return None
+            if len(items) > 1:
+                return self.execute_bulk(function_args, session)
+            if not self.bulk_item_list:
+                function_args = function_args | {self.bulk_input: items[0]}
+
+        output = self.func(**function_args)
+        result = self.parse_data(session.cache, output) if self.parse_data else None
+
+        if self.refresh_cache:
+            self.invalidate_cache(session)
+
+        return result
+
+    def invalidate_cache(self, session: RioSession):
+        session.refresh_cache(None if self.refresh_cache is True else self.refresh_cache)
+
+    def execute_bulk(self, function_args: dict, session: RioSession, executor: Optional[BulkExecutor] = None):
+        """
+        Runs the function once per item of the bulk input over a bounded thread pool.
+
+        Returns:
+            The BulkReport of every item, followed by the parsed output of each successful call if the handler parses data.
+        """
+        executor = executor or BulkExecutor()
+        items = function_args[self.bulk_input]
+        report = executor.run(
+            self.func,
+            items,
+            lambda item: function_args | {self.bulk_input: [item] if self.bulk_item_list else item},
+            label=f'{len(items)} items'
+        )
+
+        if self.refresh_cache and report.succeeded:
+            self.invalidate_cache(session)
+
+        if not self.parse_data:
+            return report
+        return [report] + [self.parse_data(session.cache, result.output) for result in report.succeeded]
 
 
 # Community Functions
@@ -46,7 +121,7 @@ community_functions = {
             param.global_link,
             param.comm_desc,
         ],
-        refresh_cache=True
+        refresh_cache=['communities']
     ),
     'Add Community Members': FunctionHandler(
         func=web_func.community_invite,
@@ -54,6 +129,7 @@ community_functions = {
             param.community_name_closed,
             param.invite_list,
         ],
+        bulk_input='invite_list',
     ),
     'List Community Members': FunctionHandler(
         func=web_func.community_members,
@@ -75,6 +151,7 @@ community_functions = {
             param.community_name_closed,
             param.manage_community_admins,
         ],
+        bulk_input='user_list',
     ),
     'List Community Sponsor': FunctionHandler(
         func=web_func.community_sponsor,
@@ -90,7 +167,8 @@ community_functions = {
             param.community_name_closed,
             param.manage_user_community_keys,
         ],
-        parse_data=data_parsing.user_keys_to_dataframe
+        parse_data=data_parsing.user_keys_to_dataframe,
+        bulk_input='user_list',
     ),
     'Community-Wide User Keys': FunctionHandler(
         func=web_func.community_key,
@@ -134,6 +212,7 @@ community_functions = {
             param.community_name_closed,
             param.community_remove_users,
         ],
+        bulk_input='user_list',
     ),
     'Add or Remove Community Bans': FunctionHandler(
         func=web_func.community_manage,
@@ -141,13 +220,15 @@ community_functions = {
             param.community_name_closed,
             param.community_manage_bans,
         ],
+        bulk_input='user_list',
     ),
     'Remove All Users from Community': FunctionHandler(
-        func=web_func.community_manage,
+        func=community_removal.remove_all_members,
         inputs=[
             param.community_name_closed,
             param.community_remove_all_users,
         ],
+        parse_data=data_parsing.print_data,
     )
 }
 
@@ -160,7 +241,7 @@ tag_functions = {
             param.tag_name_free,
             param.tag_desc,
         ],
-        refresh_cache=True
+        refresh_cache=['tags']
     ),
     'Create Gecko Code Tag': FunctionHandler(
         func=partial(web_func.create_tag, tag_type='Gecko Code'),
@@ -171,7 +252,7 @@ tag_functions = {
             param.gecko_code,
             param.gecko_code_desc,
         ],
-        refresh_cache=True
+        refresh_cache=['tags']
     ),
     'Update Tag Name': FunctionHandler(
         func=web_func.update_tag,
@@ -179,7 +260,7 @@ tag_functions = {
             param.tag_id,
             param.tag_name_free,
         ],
-        refresh_cache=True
+        refresh_cache=['tags']
     ),
     'Update Tag Description': FunctionHandler(
         func=web_func.update_tag,
@@ -194,7 +275,7 @@ tag_functions = {
             param.tag_id,
             param.tag_type,
         ],
-        refresh_cache=True
+        refresh_cache=['tags']
     ),
     'Update Tag Gecko Code Desc': FunctionHandler(
         func=web_func.update_tag,
@@ -216,7 +297,7 @@ tag_functions = {
             param.tag_name_closed
         ],
         constant_inputs={
-            'tags_df': cache.return_tags_df()
+            'tags_df': CacheSource(lambda cache: cache.return_tags_df())
         },
         parse_data=data_parsing.print_df_columns_by_row
     )
@@ -236,7 +317,7 @@ game_mode_functions = {
             param.add_tag_ids,
             param.game_mode_to_mirror_tags_from,
         ],
-        refresh_cache=True
+        refresh_cache=['game_modes']
     ),
     'Add Tags to Game Mode': FunctionHandler(
         func=web_func.update_game_mode,
@@ -284,7 +365,7 @@ game_mode_functions = {
             param.tag_set_id,
             param.game_mode_name_free,
         ],
-        refresh_cache=True
+        refresh_cache=['game_modes']
     ),
     'Update Game Mode Description': FunctionHandler(
         func=web_func.update_game_mode,
@@ -307,12 +388,29 @@ game_mode_functions = {
         ],
         parse_data=data_parsing.ladder_to_dataframe,
     ),
+    'Show Local Game Mode Ladder': FunctionHandler(
+        func=ladder.local_ladder,
+        inputs=[
+            param.game_mode_name_closed,
+            param.ladder_as_of,
+            param.ladder_exclude_users,
+            param.ladder_players,
+        ],
+        parse_data=data_parsing.print_data,
+    ),
+    'Validate Local Game Mode Ladder': FunctionHandler(
+        func=ladder.validate_local_ladder,
+        inputs=[
+            param.game_mode_name_closed,
+        ],
+        parse_data=data_parsing.print_data,
+    ),
     'Delete Game Mode': FunctionHandler(
         func=web_func.delete_game_mode,
         inputs=[
             param.game_mode_name_closed,
         ],
-        refresh_cache=True
+        refresh_cache=['game_modes']
     )
 }
 
@@ -331,20 +429,32 @@ rio_mod_functions = {
         ],
         parse_data=data_parsing.print_data,
     ),
+    'Manual Game Submission From Statfiles (Bulk)': FunctionHandler(
+        func=stat_file_submission.submit_stat_files,
+        inputs=[
+            param.manual_submission_stat_files,
+        ],
+        parse_data=data_parsing.print_data,
+        constant_inputs={'tag_set_names': param.game_mode_names_by_id_source},
+    ),
     'Add User to User Group (Ban Users)': FunctionHandler(
         func=web_func.add_user_to_user_group,
         inputs=[
-            param.username,
+            param.usernames,
             param.user_group,
         ],
+        bulk_input='username',
+        bulk_item_list=False,
     ),
     'Remove User from User Group': FunctionHandler(
         func=web_func.remove_user_from_user_group,
         inputs=[
-            param.username,
+            param.usernames,
             param.user_group,
         ],
         parse_data=data_parsing.print_data,
+        bulk_input='username',
+        bulk_item_list=False,
     ),
     'Check Membership in User Group': FunctionHandler(
         func=web_func.check_for_member_in_user_group,
@@ -366,7 +476,7 @@ rio_mod_functions = {
 
 data_endpoints = {
     'Games Endpoint': FunctionHandler(
-        func=web_func.games_endpoint,
+        func=query_planner.planned_games_endpoint,
         inputs=[
             param.data_games_tag,
             param.data_games_exclude_tag,
@@ -375,16 +485,75 @@ data_endpoints = {
             param.data_games_exclude_username,
             param.data_games_captain,
             param.data_games_vs_captain,
+            param.data_games_exclude_captain,
             param.data_games_stadium,
             param.data_games_limit_games
         ],
         parse_data=data_parsing.games_endpoint_to_excel
     ),
+    'Games Endpoint (Local)': FunctionHandler(
+        func=game_warehouse.local_games_endpoint,
+        inputs=[
+            param.data_games_tag,
+            param.data_games_exclude_tag,
+            param.data_games_username,
+            param.data_games_vs_username,
+            param.data_games_exclude_username,
+            param.data_games_captain,
+            param.data_games_vs_captain,
+            param.data_games_stadium,
+            param.data_games_limit_games
+        ],
+        parse_data=data_parsing.games_endpoint_to_excel
+    ),
+    'Sync Local Games': FunctionHandler(
+        func=game_warehouse.sync_tag_sets,
+        inputs=[
+            param.data_games_tag,
+        ],
+        parse_data=data_parsing.print_data
+    ),
+    'Games Endpoint Export (Streaming)': FunctionHandler(
+        func=games_export.stream_games_endpoint,
+        inputs=[
+            param.data_games_resume_path,
+            param.data_games_export_format,
+            param.data_games_page_size,
+            param.data_games_tag,
+            param.data_games_exclude_tag,
+            param.data_games_username,
+            param.data_games_vs_username,
+            param.data_games_exclude_username,
+            param.data_games_captain,
+            param.data_games_vs_captain,
+            param.data_games_stadium,
+            param.data_games_limit_games
+        ],
+        parse_data=data_parsing.print_data
+    ),
     'Stats Endpoint': FunctionHandler(
-        func=web_func.stats_endpoint,
+        func=query_planner.planned_stats_endpoint,
         inputs=[
             param.data_games_stats_endpoint_params
         ],
         parse_data=data_parsing.stats_endpoint_to_excel
+    ),
+    'Stats Endpoint (Compare Tag Sets or Groups)': FunctionHandler(
+        func=stats_fanout.stats_fanout,
+        inputs=[
+            param.stats_fanout_tag_sets,
+            param.stats_fanout_username_groups,
+            param.data_games_stats_endpoint_params
+        ],
+        parse_data=data_parsing.print_data
     )
-}
\ No newline at end of file
+}
+
+
+function_groups = {
+    'Manage Communities': community_functions,
+    'Manage Game Modes': game_mode_functions,
+    'Manage Tags': tag_functions,
+    'Rio Mod Functions': rio_mod_functions,
+    'Data Endpoints': data_endpoints,
+}
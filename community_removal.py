@@ -0,0 +1,75 @@
+from typing import List, Union
+
+import pyRio.web_functions as web_func
+from pyRio.api_manager import APIManager
+from bulk import BulkExecutor, DEFAULT_MAX_WORKERS
+from data_parsing import usernames_by_id
+from input_conversion import InputConverters
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+
+# Members removed per community_manage request, small enough for the server to handle each request quickly
+# and to keep the members affected by one failed request to a handful
+REMOVAL_CHUNK_SIZE = 50
+
+
+def remove_all_members(
+    api_manager: APIManager,
+    community_name_closed: str,
+    confirm: bool,
+    chunk_size: int = REMOVAL_CHUNK_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS
+) -> Union[str, List]:
+    """
+    Removes every member of a community.
+
+    Member ids are resolved to usernames in one lookup against the cached user list, then removals are
+    sent in chunks of chunk_size members over a bounded pool with retries on rate limits and server errors.
+    Members removed by a successful chunk stay removed if another chunk fails, so running this again
+    only has to remove the members that are left.
+
+    Args:
+        api_manager (APIManager): The API manager used for the requests.
+        community_name_closed (str): The community to empty.
+        confirm (bool): Whether the removal was confirmed, nothing is removed otherwise.
+        chunk_size (int): The number of members removed per request.
+        max_workers (int): The maximum number of requests in flight at once.
+
+    Returns:
+        Union[str, List]: A summary, followed by a frame of the members that were not removed if any.
+    """
+    if not confirm:
+        return 'Nothing removed'
+
+    members = pd.DataFrame(web_func.community_members(api_manager, community_name_closed)['Members'])
+    if members.empty:
+        return f'{community_name_closed} has no members'
+
+    members['username'] = members['user_id'].map(usernames_by_id())
+    unknown = members[members['username'].isna()]
+    known = list(members.dropna(subset=['username'])[['username', 'user_id']].itertuples(index=False, name=None))
+
+    chunks = [known[start:start + chunk_size] for start in range(0, len(known), chunk_size)]
+    report = BulkExecutor(max_workers=max_workers).run(
+        web_func.community_manage,
+        chunks,
+        lambda chunk: {
+            'api_manager': api_manager,
+            'community_name_closed': community_name_closed,
+            'user_list': [InputConverters.community_manager_converter(username, remove=True) for username, _ in chunk]
+        },
+        label=f'Removing {len(known)} members'
+    )
+
+    failures = [{'username': username, 'user_id': user_id, 'error': str(result.error)}
+                for result in report.failed for username, user_id in result.item]
+    failures += [{'username': '', 'user_id': user_id, 'error': 'User id not in the cached user list, try Update Cache'}
+                 for user_id in unknown['user_id']]
+
+    removed = sum(len(result.item) for result in report.succeeded)
+    summary = (f'Removed {removed} of {len(members)} members from {community_name_closed} '
+               f'in {len(chunks)} requests ({report.elapsed:.1f}s)')
+    if not failures:
+        return summary
+    return [summary, pd.DataFrame(failures)]
@@ -0,0 +1,136 @@
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, Iterable, List, Set
+
+from prompt_toolkit.completion import Completer, Completion, FuzzyCompleter, WordCompleter
+
+# Option lists shorter than this keep prompt_toolkit's FuzzyCompleter, which is fast enough at that size
+INDEX_THRESHOLD = 200
+MAX_SHARED_COMPLETERS = 32
+
+
+class IndexedCompleter(Completer):
+    def __init__(self, words: Iterable[str], max_results: int = 50):
+        """
+        A fuzzy completer over a large, fixed list of options.
+
+        The index is built once: a sorted list of case-folded options for prefix lookups and
+        trigram/character posting sets for substring and subsequence lookups. Each keystroke then
+        only touches the candidate options instead of regex-scanning the whole list.
+
+        Results are ranked prefix matches first, then substring matches by position, then
+        subsequence matches by how tightly they match, and capped at max_results.
+
+        Args:
+            words (Iterable[str]): The options to complete.
+            max_results (int): The maximum number of completions returned per keystroke.
+        """
+        self.words = list(dict.fromkeys(words))
+        self.max_results = max_results
+        self._folded = [word.casefold() for word in self.words]
+        self._sorted = sorted(zip(self._folded, range(len(self.words))))
+        self._sorted_keys = [folded for folded, _ in self._sorted]
+        self._trigrams: Dict[str, Set[int]] = {}
+        self._chars: Dict[str, Set[int]] = {}
+
+        for index, folded in enumerate(self._folded):
+            for char in folded:
+                self._chars.setdefault(char, set()).add(index)
+            for start in range(len(folded) - 2):
+                self._trigrams.setdefault(folded[start:start + 3], set()).add(index)
+
+    def _prefix_matches(self, query: str) -> List[int]:
+        matches = []
+        for folded, index in islice(self._sorted, bisect_left(self._sorted_keys, query), None):
+            if not folded.startswith(query) or len(matches) == self.max_results:
+                break
+            matches.append(index)
+        return matches
+
+    def _candidates(self, posting: Dict[str, Set[int]], keys: Iterable[str]) -> Set[int]:
+        sets = sorted((posting.get(key, set()) for key in set(keys)), key=len)
+        if not sets:
+            return set()
+        return sets[0].intersection(*sets[1:])
+
+    def _substring_matches(self, query: str, exclude: Set[int]) -> List[int]:
+        if len(query) >= 3:
+            candidates = self._candidates(self._trigrams, (query[i:i + 3] for i in range(len(query) - 2)))
+        else:
+            candidates = self._candidates(self._chars, query)
+
+        ranked = []
+        for index in candidates - exclude:
+            position = self._folded[index].find(query)
+            if position >= 0:
+                ranked.append((position, len(self._folded[index]), index))
+        return [index for _, _, index in sorted(ranked)[:self.max_results]]
+
+    def _subsequence_span(self, folded: str, query: str) -> int:
+        """
+        Returns the length of the span the query matches in order, or -1 if it does not match.
+        """
+        position = start = folded.find(query[0])
+        if position < 0:
+            return -1
+        for char in query[1:]:
+            position = folded.find(char, position + 1)
+            if position < 0:
+                return -1
+        return position - start
+
+    def _subsequence_matches(self, query: str, exclude: Set[int], limit: int) -> List[int]:
+        ranked = []
+        for index in self._candidates(self._chars, query) - exclude:
+            span = self._subsequence_span(self._folded[index], query)
+            if span >= 0:
+                ranked.append((span, len(self._folded[index]), index))
+        return [index for _, _, index in sorted(ranked)[:limit]]
+
+    def match(self, text: str) -> List[str]:
+        """
+        Returns the ranked options matching the text.
+        """
+        query = text.casefold()
+        if not query:
+            return self.words[:self.max_results]
+
+        matches = self._prefix_matches(query)
+        if len(matches) < self.max_results:
+            seen = set(matches)
+            matches += self._substring_matches(query, seen)[:self.max_results - len(matches)]
+        if len(matches) < self.max_results:
+            matches += self._subsequence_matches(query, set(matches), self.max_results - len(matches))
+        return [self.words[index] for index in matches]
+
+    def get_completions(self, document, complete_event):
+        text = document.text_before_cursor
+        for word in self.match(text):
+            yield Completion(word, start_position=-len(text))
+
+
+_shared_completers: 'OrderedDict[int, tuple]' = OrderedDict()
+
+
+def completer_for(words: List[str]) -> Completer:
+    """
+    Returns a completer for the option list, sharing one IndexedCompleter per list object.
+
+    Cache sources return the same list until the cache generation changes, so every parameter
+    completing from the same source reuses one index, and a refresh builds a new one.
+    """
+    if len(words) < INDEX_THRESHOLD:
+        return FuzzyCompleter(WordCompleter(words, ignore_case=True))
+
+    key = id(words)
+    if key in _shared_completers and _shared_completers[key][0] is words:
+        _shared_completers.move_to_end(key)
+        return _shared_completers[key][1]
+
+    completer = IndexedCompleter(words)
+    # Holding the list keeps its id from being reused while the entry exists
+    _shared_completers[key] = (words, completer)
+    if len(_shared_completers) > MAX_SHARED_COMPLETERS:
+        _shared_completers.popitem(last=False)
+    return completer
@@ -0,0 +1,84 @@
+import sys
+from types import ModuleType
+
+from pyRio.api_manager import APIManager
+from lazy_imports import lazy_import
+
+requests = lazy_import('requests')
+
+DEFAULT_POOL_SIZE = 16
+DEFAULT_TIMEOUT = 30.0
+
+
+def _timeout_adapter(pool_size: int, timeout: float):
+    class TimeoutHTTPAdapter(requests.adapters.HTTPAdapter):
+        """
+        An HTTPAdapter applying a default timeout to requests made without one.
+        """
+        def send(self, request, **kwargs):
+            if kwargs.get('timeout') is None:
+                kwargs['timeout'] = timeout
+            return super().send(request, **kwargs)
+
+    return TimeoutHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+
+
+class SessionRequests:
+    def __init__(self, session: 'requests.Session'):
+        """
+        Stands in for the requests module, sending its request functions through one keep-alive session.
+        Everything else, such as requests.exceptions, is read from the requests module.
+
+        Parameters:
+        - session (requests.Session): The session the requests are sent through.
+        """
+        self.session = session
+
+    def request(self, method, url, **kwargs):
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, params=None, **kwargs):
+        return self.session.get(url, params=params, **kwargs)
+
+    def post(self, url, data=None, json=None, **kwargs):
+        return self.session.post(url, data=data, json=json, **kwargs)
+
+    def put(self, url, data=None, **kwargs):
+        return self.session.put(url, data=data, **kwargs)
+
+    def patch(self, url, data=None, **kwargs):
+        return self.session.patch(url, data=data, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.session.delete(url, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(requests, name)
+
+
+def pooled_session(manager: APIManager, pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT) -> 'requests.Session':
+    """
+    Gives the manager one shared keep-alive session of pool_size connections with a default timeout,
+    so concurrent calls reuse connections instead of opening new ones.
+
+    The session is set as manager.session, reusing the manager's own session if it has one. The module
+    level requests functions, which open a new connection per call, are routed through the session for
+    the manager's module.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    session = getattr(manager, 'session', None)
+    if not isinstance(session, requests.Session):
+        session = requests.Session()
+        manager.session = session
+
+    adapter = _timeout_adapter(pool_size, timeout)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    manager_module = sys.modules.get(type(manager).__module__)
+    module_requests = getattr(manager_module, 'requests', None)
+    if isinstance(module_requests, SessionRequests) or (isinstance(module_requests, ModuleType) and module_requests.__name__ == 'requests'):
+        manager_module.requests = SessionRequests(session)
+    return session
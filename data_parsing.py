@@ -1,21 +1,85 @@
-import pandas as pd
+from __future__ import annotations
+
 import os
 from datetime import datetime
-import pytz
+from typing import Optional, TYPE_CHECKING
+
+from lazy_imports import lazy_import
+from session import get_session, CacheSource
+from lookup_tables import decode_ids
+
+if TYPE_CHECKING:
+    from pyRio.web_caching import CompleterCache
+
+pd = lazy_import('pandas')
+pytz = lazy_import('pytz')
+endpoint_handling = lazy_import('pyRio.endpoint_handling')
+
+EXPORT_FOLDER = 'endpoint_data'
+EXPORT_FORMATS = ['xlsx', 'parquet', 'feather', 'csv']
+RENDER_CHUNK_ROWS = 1000
+
+# Integer user id -> username, built once per cache generation and shared by every join on user_id
+usernames_by_id = CacheSource(lambda cache: pd.Series(
+    list(cache.users_dictionary().values()),
+    index=pd.to_numeric(pd.Index(list(cache.users_dictionary().keys()))),
+    name='username'
+))
+
+
+def index_by_username(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Indexes a frame with a user_id column by username, looking up only the ids in the frame.
+    """
+    return df.set_index(df['user_id'].map(usernames_by_id()).rename('username'))
+
 
-from pyRio.web_caching import CompleterCache
-from pyRio.endpoint_handling import games_endpoints, stats_endpoints
+def export_dataframe(df: pd.DataFrame, name: str, index: bool = True, export_format: Optional[str] = None) -> str:
+    """
+    Writes an endpoint frame to the export folder in the session's export format.
+
+    Parquet and Feather are written with typed columns and zstd compression so they can be
+    memory-mapped by downstream notebooks, CSV and Excel are written as before.
+
+    Args:
+        df (pd.DataFrame): The frame to write.
+        name (str): The file name prefix, the current date and time is appended.
+        index (bool): Whether to keep the frame's index.
+        export_format (Optional[str]): One of EXPORT_FORMATS, the session's export format if not given.
+
+    Returns:
+        str: The path of the written file.
+    """
+    export_format = export_format or get_session().export_format
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'Unsupported export format {export_format}. Valid formats are: {", ".join(EXPORT_FORMATS)}')
+
+    # Specify the folder path in the same directory
+    os.makedirs(EXPORT_FOLDER, exist_ok=True)  # Create the folder if it doesn't exist
+
+    # Generate a filename with the current date
+    current_date_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    file_path = os.path.join(EXPORT_FOLDER, f'{name}_{current_date_time}.{export_format}')
+
+    if export_format == 'xlsx':
+        df.to_excel(file_path, index=index)
+    elif export_format == 'csv':
+        df.to_csv(file_path, index=index)
+    else:
+        typed_df = (df if index else df.reset_index(drop=True)).convert_dtypes()
+        if export_format == 'parquet':
+            typed_df.to_parquet(file_path, index=index, compression='zstd')
+        else:
+            # Feather only stores a default index, so a meaningful index is kept as columns
+            typed_df = typed_df.reset_index() if index else typed_df
+            typed_df.to_feather(file_path, compression='zstd')
+    return file_path
 
-pd.set_option('display.max_rows', None)
-pd.set_option('display.max_columns', None) 
 
 def community_members_to_dataframe(cache: CompleterCache, community_members_data):
     members_list = community_members_data['Members']
     df = pd.DataFrame(members_list)
-    df2 = pd.DataFrame(list(cache.users_dictionary().items()), columns=['user_id', 'username'])
-    df2['user_id'] = pd.to_numeric(df2['user_id'])
-    df = df.merge(df2, on='user_id', how='left')
-    df = df.set_index('username')
+    df = index_by_username(df)
 
     est = pytz.timezone('US/Eastern')
     df['date_joined'] = pd.to_datetime(df['date_joined'], unit='s').dt.tz_localize('UTC').dt.tz_convert(est)
@@ -30,9 +94,8 @@ def print_community_sponsor(cache, community_sponsor):
     return f'Community Sponsor: {community_sponsor["sponsor"]}'
 
 def user_keys_to_dataframe(cache, community_user_keys_data):
-    df2 = pd.DataFrame(list(cache.users_dictionary().items()), columns=['user_id', 'username'])
-    df2['user_id'] = pd.to_numeric(df2['user_id'])
-    return pd.DataFrame(community_user_keys_data['members']).merge(df2, on='user_id', how='left').set_index('username')
+    df = pd.DataFrame(community_user_keys_data['members'])
+    return index_by_username(df)
 
 def community_user_keys_to_dataframe(cache, community_user_keys_data):
     return pd.DataFrame(community_user_keys_data)
@@ -51,37 +114,42 @@ def ladder_to_dataframe(cache, ladder):
 def tags_list_to_dataframe(cache, tags):
     return pd.DataFrame(tags['Tags']).set_index('id')
 
-def print_df_columns_by_row(cache, df):
-    output = []
-    for index, row in df.iterrows():
-        output.append(f"ID: {index}:")
-        for column, value in row.items():
-            if isinstance(value, str) and '\n' in value:
-                # Add value starting on a new line if it contains a newline
-                output.append(f"{column}:\n{value[:-1]}")
-            else:
-                output.append(f"{column}: {value}")
-    return "\n".join(output)
+def _column_lines(column: str, values: pd.Series) -> pd.Series:
+    """
+    Formats a whole column as "column: value" lines. String values containing a newline start on
+    their own line with the trailing newline dropped.
+    """
+    text = values.map(str)
+    lines = f'{column}: ' + text
+    if values.dtype == object or pd.api.types.is_string_dtype(values):
+        multiline = (values.map(type) == str) & text.str.contains('\n', regex=False)
+        lines = lines.mask(multiline, f'{column}:\n' + text.str[:-1])
+    return lines
 
 
-def print_data(cache, data):
-    return data
+def print_df_columns_by_row(cache, df, chunk_rows: int = RENDER_CHUNK_ROWS):
+    """
+    Renders each row as an "ID: index:" header followed by one line per column.
 
-def games_endpoint_to_excel(cache: CompleterCache, games_endpoint):
-    df = games_endpoints(games_endpoint, cache)
+    Columns are formatted whole rather than cell by cell, and the output is yielded in chunks of
+    chunk_rows rows so large frames start printing straight away.
+    """
+    if df.empty:
+        return
+    headers = pd.Series('ID: ' + df.index.astype(str) + ':', index=df.index)
+    columns = [_column_lines(str(column), df[column]) for column in df.columns]
+    rows = headers.str.cat(columns, sep='\n') if columns else headers
 
-    # Specify the folder path in the same directory
-    folder_path = "endpoint_data"
-    os.makedirs(folder_path, exist_ok=True)  # Create the folder if it doesn't exist
+    for start in range(0, len(rows), chunk_rows):
+        yield '\n'.join(rows.iloc[start:start + chunk_rows])
 
-    # Generate a filename with the current date
-    current_date_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    file_name = f"games_data_{current_date_time}.xlsx"
-    file_path = os.path.join(folder_path, file_name)
 
-    # Save to Excel
-    df.to_excel(file_path, index=False)
-    return file_path
+def print_data(cache, data):
+    return data
+
+def games_endpoint_to_excel(cache: CompleterCache, games_endpoint):
+    df = decode_ids(endpoint_handling.games_endpoints(games_endpoint, cache))
+    return export_dataframe(df, 'games_data', index=False)
 
 def game_mode_list_to_dataframe(cache: CompleterCache, games_list_data):
     df = pd.DataFrame(games_list_data['Tag Sets'])
@@ -89,20 +157,8 @@ def game_mode_list_to_dataframe(cache: CompleterCache, games_list_data):
     # Drop the 'tag_ids' and 'tags' columns
     df = df.drop(columns=['tag_ids', 'tags'])
 
-    print(df)
+    return df
 
 def stats_endpoint_to_excel(cache: CompleterCache, stats_endpoint):
-    df = stats_endpoints(stats_endpoint, cache)
-
-    # Specify the folder path in the same directory
-    folder_path = "endpoint_data"
-    os.makedirs(folder_path, exist_ok=True)  # Create the folder if it doesn't exist
-
-    # Generate a filename with the current date
-    current_date_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    file_name = f"stats_data_{current_date_time}.xlsx"
-    file_path = os.path.join(folder_path, file_name)
-
-    # Save to Excel
-    df.to_excel(file_path)
-    return file_path
\ No newline at end of file
+    df = decode_ids(endpoint_handling.stats_endpoints(stats_endpoint, cache))
+    return export_dataframe(df, 'stats_data')
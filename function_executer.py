@@ -1,6 +1,65 @@
-from typing import List, Union, Dict, Optional
-from prompt_toolkit.completion import WordCompleter, FuzzyCompleter
+import sys
+from types import GeneratorType
+from typing import Any, List, Union, Dict, Optional
 from prompt_toolkit import prompt
+from prompt_toolkit.document import Document
+from prompt_toolkit.validation import ValidationError
+
+from completers import completer_for
+from session import get_session
+
+
+def merge_data_params(user_input: List[Dict]) -> Dict:
+    """
+    Merges the list of single-key dicts gathered for a data params parameter into one dict.
+
+    Args:
+        user_input (List[Dict]): The subparameter values in the order they were entered.
+
+    Returns:
+        Dict: The merged parameters, with list values for the same key concatenated.
+    """
+    merged = {}
+    for d in user_input:
+        for key, value in d.items():
+            # If the key already exists in merged
+            if key in merged:
+                # Only merge list-type values
+                if isinstance(merged[key], list) and isinstance(value, list):
+                    merged[key].extend(value)
+                elif isinstance(merged[key], list):
+                    merged[key].append(value)
+                else:
+                    # Don't try to merge non-list values (e.g., bool, str) — overwrite or raise warning
+                    merged[key] = value
+            else:
+                # First time seeing the key
+                merged[key] = value if not isinstance(value, list) else list(value)
+    return merged
+
+
+def print_result(result):
+    """
+    Prints a parsed function result, one item at a time for collections and one chunk at a time for generators.
+    """
+    if result is None:
+        return
+    if isinstance(result, GeneratorType):
+        for chunk in result:
+            sys.stdout.write(f'{chunk}\n')
+            sys.stdout.flush()
+        return
+    # Checked by module name so printing other results never forces pandas to load
+    if type(result).__module__.startswith('pandas') and type(result).__name__ == 'DataFrame':
+        from pager import print_dataframe
+        print_dataframe(result, interactive=sys.stdout.isatty() and sys.stdin.isatty())
+        return
+    if isinstance(result, (list, tuple, set)):
+        for item in result:
+            print_result(item)
+            print()
+    else:
+        print(result)
 
 
 class ParameterProcessor:
@@ -24,9 +83,9 @@ class ParameterProcessor:
         Returns:
             str: User input after optional processing, or the break key if entered.
         """
-        completer = WordCompleter(parameter.completer, ignore_case=True) if parameter.completer else None
-        completer = FuzzyCompleter(completer) if completer else None
-        user_input = prompt(parameter.prompt, completer=completer, validator=parameter.validator, multiline=parameter.multiline)
+        completer = completer_for(parameter.completer) if parameter.completer else None
+        user_input = prompt(parameter.prompt, completer=completer, validator=parameter.validator, multiline=parameter.multiline,
+                            rprompt=get_session().cache_status, refresh_interval=1.0)
         
         if user_input == self.break_key:
             return self.break_key
@@ -64,6 +123,9 @@ class ParameterProcessor:
             while True:
                 user_input = self.prompt_for_input(parameter)
                 if user_input == self.break_key:
+                    if len(inputs) < parameter.min_items:
+                        print(f'Enter at least {parameter.min_items} value(s) before "{self.break_key}"')
+                        continue
                     break
                 
                 if self.has_subparameters(user_input, parameter):
@@ -102,25 +164,109 @@ class ParameterProcessor:
                 for key, value in user_input.items():
                     function_args[key] = value
             elif parameter.data_params_dict:
-                merged = {}
                 print(user_input)
-                for d in user_input:
-                    for key, value in d.items():
-                        # If the key already exists in merged
-                        if key in merged:
-                            # Only merge list-type values
-                            if isinstance(merged[key], list) and isinstance(value, list):
-                                merged[key].extend(value)
-                            elif isinstance(merged[key], list):
-                                merged[key].append(value)
-                            else:
-                                # Don't try to merge non-list values (e.g., bool, str) — overwrite or raise warning
-                                merged[key] = value
-                        else:
-                            # First time seeing the key
-                            merged[key] = value if not isinstance(value, list) else list(value)
-                function_args[arg_name] = merged
+                function_args[arg_name] = merge_data_params(user_input)
             else:
                 function_args[arg_name] = user_input
         
-        return function_args
\ No newline at end of file
+        return function_args
+
+
+class ArgumentProcessor:
+    def __init__(self, break_key: str = 'q'):
+        """
+        Builds function arguments from supplied values instead of prompts, for scripted and batch runs.
+        Values are validated and processed with the same APIParameter metadata the prompts use.
+
+        Values are keyed by each parameter's arg_name. A parameter with subparameters takes a dict of
+        {subparameter key: value}, a looping parameter takes a list, and optional parameters may be omitted.
+
+        Args:
+            break_key (str): Key that ends input loops, accepted for parity with ParameterProcessor.
+        """
+        self.break_key = break_key
+
+    def process_input(self, parameter, value: Any):
+        """
+        Validates a single value against the parameter and applies its input processing.
+
+        Raises:
+            ValueError: If the value fails the parameter's validator.
+        """
+        text = str(value)
+        if parameter.validator:
+            try:
+                parameter.validator.validate(Document(text))
+            except ValidationError as e:
+                raise ValueError(f'{parameter.arg_name}: {text!r} is invalid. {e.message}') from e
+
+        if parameter.input_processing:
+            return parameter.input_processing(text)
+        return text
+
+    def process_value(self, parameter, value: Any):
+        """
+        Resolves the value for the parameter, recursing into subparameters.
+
+        Returns:
+            Union[str, list, dict]: The processed value, shaped the way ParameterProcessor.execute_prompt returns it.
+        """
+        if parameter.subparameters and isinstance(value, dict):
+            if parameter.loop:
+                inputs = []
+                for key, subvalue in value.items():
+                    self.process_input(parameter, key)
+                    subparameter = parameter.subparameters[key]
+                    inputs.append({subparameter.arg_name: self.process_value(subparameter, subvalue)})
+                return inputs
+            if len(value) != 1:
+                raise ValueError(f'{parameter.arg_name}: choose exactly one of {", ".join(parameter.subparameters)}')
+            key, subvalue = next(iter(value.items()))
+            self.process_input(parameter, key)
+            return self.process_value(parameter.subparameters[key], subvalue)
+
+        if parameter.loop:
+            values = value if isinstance(value, list) else [value]
+            if len(values) < parameter.min_items:
+                raise ValueError(f'{parameter.arg_name}: enter at least {parameter.min_items} value(s)')
+            return [self.process_input(parameter, item) for item in values]
+
+        return self.process_input(parameter, value)
+
+    def gather_function_args(self, parameters: List, values: Dict[str, Any]) -> Dict:
+        """
+        Assembles function arguments from the supplied values, mirroring ParameterProcessor.gather_function_args.
+
+        Args:
+            parameters (List[APIParameter]): A list of input parameters.
+            values (Dict[str, Any]): The raw values keyed by arg_name.
+
+        Returns:
+            Dict: A dictionary of argument names and their processed values.
+
+        Raises:
+            ValueError: If a required value is missing, unknown or invalid.
+        """
+        known = {parameter.arg_name for parameter in parameters}
+        unknown = set(values) - known
+        if unknown:
+            raise ValueError(f'Unknown arguments: {", ".join(sorted(unknown))}. Expected: {", ".join(sorted(known))}')
+
+        function_args = {}
+        for parameter in parameters:
+            arg_name = parameter.arg_name
+            if arg_name not in values:
+                if not (parameter.optional or parameter.loop):
+                    raise ValueError(f'Missing required argument: {arg_name}')
+                user_input = [] if parameter.loop else None
+            else:
+                user_input = self.process_value(parameter, values[arg_name])
+
+            if arg_name == '_dict':
+                function_args |= user_input
+            elif parameter.data_params_dict:
+                function_args[arg_name] = merge_data_params(user_input)
+            else:
+                function_args[arg_name] = user_input
+
+        return function_args
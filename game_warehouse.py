@@ -0,0 +1,260 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+from pyRio.api_manager import APIManager
+from cache_snapshot import DEFAULT_CACHE_DIR
+from games_export import (fetch_games_since, GAME_ID_FIELD, GAME_DATE_FIELD, AWAY_USER_FIELD, HOME_USER_FIELD,
+                          AWAY_SCORE_FIELD, HOME_SCORE_FIELD, AWAY_CAPTAIN_FIELD, HOME_CAPTAIN_FIELD, STADIUM_FIELD)
+from session import RioSession
+
+DEFAULT_WAREHOUSE_PATH = os.path.join(DEFAULT_CACHE_DIR, 'games.sqlite3')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS games (
+    game_id INTEGER PRIMARY KEY,
+    date_time_end INTEGER NOT NULL,
+    away_user TEXT,
+    home_user TEXT,
+    away_captain TEXT,
+    home_captain TEXT,
+    stadium TEXT,
+    away_score INTEGER,
+    home_score INTEGER,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS game_tag_sets (
+    tag_set TEXT NOT NULL,
+    game_id INTEGER NOT NULL,
+    PRIMARY KEY (tag_set, game_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS synced_tag_sets (
+    tag_set TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_date ON games (date_time_end);
+CREATE INDEX IF NOT EXISTS games_away_user ON games (away_user, date_time_end);
+CREATE INDEX IF NOT EXISTS games_home_user ON games (home_user, date_time_end);
+CREATE INDEX IF NOT EXISTS games_away_captain ON games (away_captain);
+CREATE INDEX IF NOT EXISTS games_home_captain ON games (home_captain);
+CREATE INDEX IF NOT EXISTS games_stadium ON games (stadium);
+CREATE INDEX IF NOT EXISTS game_tag_sets_game ON game_tag_sets (game_id);
+'''
+
+# Columns of a ladder row: [game_id, date_time_end, away_user, home_user, away_score, home_score]
+LADDER_COLUMNS = 'g.game_id, g.date_time_end, g.away_user, g.home_user, g.away_score, g.home_score'
+
+
+def _in(column: str, values: List) -> str:
+    return f'{column} IN ({", ".join("?" * len(values))})'
+
+
+class GameWarehouse:
+    def __init__(self, path: str = DEFAULT_WAREHOUSE_PATH):
+        """
+        A SQLite store of games synced from the games endpoint, one tag set at a time.
+
+        Each game is kept whole as JSON alongside indexed columns for the games endpoint filters, so filtered
+        queries over synced tag sets are answered locally in the same shape as the games endpoint response.
+
+        Parameters:
+        - path (str): The database file.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def synced_tag_sets(self) -> List[str]:
+        return [row[0] for row in self.connection.execute('SELECT tag_set FROM synced_tag_sets ORDER BY tag_set')]
+
+    def _last_synced(self, tag_set: str):
+        """
+        Returns the latest end date stored for a tag set and the ids of the games ending then.
+        """
+        last_date = self.connection.execute(
+            'SELECT MAX(g.date_time_end) FROM games g JOIN game_tag_sets t ON t.game_id = g.game_id WHERE t.tag_set = ?',
+            (tag_set,)
+        ).fetchone()[0]
+        if last_date is None:
+            return None, []
+        known_ids = [row[0] for row in self.connection.execute(
+            'SELECT g.game_id FROM games g JOIN game_tag_sets t ON t.game_id = g.game_id '
+            'WHERE t.tag_set = ? AND g.date_time_end = ?', (tag_set, last_date)
+        )]
+        return last_date, known_ids
+
+    def sync(self, api_manager: APIManager, tag_set: str) -> int:
+        """
+        Fetches the games of a tag set that ended since its latest stored game.
+
+        Returns:
+            int: The number of new games.
+        """
+        last_date, known_ids = self._last_synced(tag_set)
+        new_games = 0
+        with self.connection:
+            for page in fetch_games_since(api_manager, last_date, known_ids, tag=[tag_set]):
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    [(game[GAME_ID_FIELD], game[GAME_DATE_FIELD], game.get(AWAY_USER_FIELD), game.get(HOME_USER_FIELD),
+                      game.get(AWAY_CAPTAIN_FIELD), game.get(HOME_CAPTAIN_FIELD), game.get(STADIUM_FIELD),
+                      game.get(AWAY_SCORE_FIELD), game.get(HOME_SCORE_FIELD), json.dumps(game)) for game in page]
+                )
+                self.connection.executemany('INSERT OR IGNORE INTO game_tag_sets VALUES (?, ?)',
+                                            [(tag_set, game[GAME_ID_FIELD]) for game in page])
+                new_games += len(page)
+            self.connection.execute('INSERT OR REPLACE INTO synced_tag_sets VALUES (?, ?)', (tag_set, time.time()))
+        return new_games
+
+    def _where(
+        self,
+        tag: Optional[List[str]] = None,
+        exclude_tag: Optional[List[str]] = None,
+        username: Optional[List[str]] = None,
+        vs_username: Optional[List[str]] = None,
+        exclude_username: Optional[List[str]] = None,
+        captain: Optional[List[str]] = None,
+        vs_captain: Optional[List[str]] = None,
+        exclude_captain: Optional[List[str]] = None,
+        stadium: Optional[List[str]] = None,
+        start_date: Optional[int] = None,
+        end_date: Optional[int] = None
+    ):
+        """
+        Builds the WHERE clause and its parameters for the games endpoint filters. Player and captain filters
+        apply to one side of the game and their vs_ counterparts to the other, whichever side is home.
+        """
+        clauses, params = [], []
+
+        if tag:
+            clauses.append(f'g.game_id IN (SELECT game_id FROM game_tag_sets WHERE {_in("tag_set", tag)})')
+            params += tag
+        if exclude_tag:
+            clauses.append(f'g.game_id NOT IN (SELECT game_id FROM game_tag_sets WHERE {_in("tag_set", exclude_tag)})')
+            params += exclude_tag
+        if exclude_username:
+            clauses.append(f'NOT {_in("g.away_user", exclude_username)} AND NOT {_in("g.home_user", exclude_username)}')
+            params += exclude_username * 2
+        if exclude_captain:
+            clauses.append(f'NOT {_in("g.away_captain", exclude_captain)} AND NOT {_in("g.home_captain", exclude_captain)}')
+            params += exclude_captain * 2
+        if stadium:
+            clauses.append(_in('g.stadium', stadium))
+            params += stadium
+        if start_date is not None:
+            clauses.append('g.date_time_end >= ?')
+            params.append(start_date)
+        if end_date is not None:
+            clauses.append('g.date_time_end <= ?')
+            params.append(end_date)
+
+        side_filters = [('user', username), ('captain', captain)]
+        opponent_filters = [('user', vs_username), ('captain', vs_captain)]
+        if any(values for _, values in side_filters + opponent_filters):
+            orientations = []
+            for side, opponent in (('away', 'home'), ('home', 'away')):
+                conditions = [_in(f'g.{side}_{field}', values) for field, values in side_filters if values]
+                conditions += [_in(f'g.{opponent}_{field}', values) for field, values in opponent_filters if values]
+                orientations.append(f'({" AND ".join(conditions)})')
+                params += [value for _, values in side_filters + opponent_filters if values for value in values]
+            clauses.append(f'({" OR ".join(orientations)})')
+
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def _select(self, columns: str, limit_games: Optional[int] = None, **filters) -> sqlite3.Cursor:
+        where, params = self._where(**filters)
+        query = f'SELECT {columns} FROM games g{where} ORDER BY g.date_time_end DESC, g.game_id DESC'
+        if limit_games:
+            query += ' LIMIT ?'
+            params.append(int(limit_games))
+        return self.connection.execute(query, params)
+
+    def games(self, **filters) -> List[Dict]:
+        """
+        Returns the stored games matching the games endpoint filters, newest first, as raw game dicts.
+        """
+        return [json.loads(row[0]) for row in self._select('g.data', **filters)]
+
+    def game_ids(self, **filters) -> List[int]:
+        return [row[0] for row in self._select('g.game_id', **filters)]
+
+    def count(self, limit_games: Optional[int] = None, **filters) -> int:
+        where, params = self._where(**filters)
+        count = self.connection.execute(f'SELECT COUNT(*) FROM games g{where}', params).fetchone()[0]
+        return min(count, int(limit_games)) if limit_games else count
+
+    def ladder_rows(self, tag_set: str, after: Optional[List[int]] = None) -> List[list]:
+        """
+        Returns a tag set's games as ladder rows in end date order, only those after the (date, game_id) position if given.
+        """
+        query = f'SELECT {LADDER_COLUMNS} FROM games g JOIN game_tag_sets t ON t.game_id = g.game_id WHERE t.tag_set = ?'
+        params = [tag_set]
+        if after:
+            query += ' AND (g.date_time_end, g.game_id) > (?, ?)'
+            params += after
+        query += ' ORDER BY g.date_time_end, g.game_id'
+        return [list(row) for row in self.connection.execute(query, params)]
+
+
+_warehouse: Optional[GameWarehouse] = None
+
+
+def get_warehouse() -> GameWarehouse:
+    global _warehouse
+    if _warehouse is None:
+        _warehouse = GameWarehouse()
+    return _warehouse
+
+
+def sync_tag_sets(api_manager: APIManager, tag: Optional[List[str]] = None) -> str:
+    """
+    Tops up the warehouse with the games of the given tag sets played since their last sync,
+    or of every tag set synced before if none are given.
+    """
+    warehouse = get_warehouse()
+    tag_sets = tag or warehouse.synced_tag_sets()
+    if not tag_sets:
+        raise ValueError('No tag sets have been synced yet, name the tag sets to sync')
+
+    lines = []
+    for tag_set in tag_sets:
+        start = time.perf_counter()
+        new_games = warehouse.sync(api_manager, tag_set)
+        lines.append(f'{tag_set}: {new_games} new games ({time.perf_counter() - start:.1f}s)')
+    return '\n'.join(lines)
+
+
+def local_games_endpoint(api_manager: APIManager, **filters) -> Dict:
+    """
+    Answers a games endpoint query from the warehouse. Tag filters must only name synced tag sets, and without
+    a tag filter every stored game is searched.
+
+    Returns:
+        Dict: The matching games in the games endpoint response shape.
+    """
+    warehouse = get_warehouse()
+    unsynced = set(filters.get('tag') or []) - set(warehouse.synced_tag_sets())
+    if unsynced:
+        raise ValueError(f'Not synced locally: {", ".join(sorted(unsynced))}. Run "python main.py sync" with these tag sets first')
+
+    start = time.perf_counter()
+    games = warehouse.games(**{key: value for key, value in filters.items() if value not in (None, [])})
+    print(f'{len(games)} games found locally in {(time.perf_counter() - start) * 1000:.0f} ms')
+    return {'games': games}
+
+
+def main(session: RioSession, args) -> int:
+    """
+    Entry point for the sync command.
+    """
+    if session.cache.offline:
+        print('Offline mode: nothing to sync')
+        return 1
+    print(sync_tag_sets(session.manager, args.tag_sets))
+    return 0
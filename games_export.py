@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, TYPE_CHECKING
+
+import pyRio.web_functions as web_func
+from pyRio.api_manager import APIManager
+from lazy_imports import lazy_import
+from lookup_tables import decode_ids
+from session import get_session
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+endpoint_handling = lazy_import('pyRio.endpoint_handling')
+
+EXPORT_FOLDER = 'endpoint_data'
+STREAM_FORMATS = ['csv', 'jsonl', 'parquet']
+DEFAULT_PAGE_SIZE = 500
+
+# Fields of each game in the raw games endpoint response used to page backwards through time
+GAME_ID_FIELD = 'game_id'
+GAME_DATE_FIELD = 'date_time_end'
+# Fields of each game read by local computations such as the ladder and the game warehouse
+AWAY_USER_FIELD = 'away_user'
+HOME_USER_FIELD = 'home_user'
+AWAY_SCORE_FIELD = 'away_score'
+HOME_SCORE_FIELD = 'home_score'
+AWAY_CAPTAIN_FIELD = 'away_captain'
+HOME_CAPTAIN_FIELD = 'home_captain'
+STADIUM_FIELD = 'stadium'
+
+
+class GamesExportWriter:
+    def __init__(self, path: str, export_format: str):
+        """
+        Appends pages of games to a CSV or JSON Lines file, or to a directory of Parquet part files.
+        Each page is written as soon as it arrives so memory stays bounded by the page size.
+        """
+        self.path = path
+        self.export_format = export_format
+
+    def size(self) -> Optional[int]:
+        """
+        The bytes written to a CSV or JSON Lines export, None for Parquet as each page is its own file.
+        """
+        if self.export_format == 'parquet':
+            return None
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def truncate(self, size: Optional[int]):
+        """
+        Drops anything written after size, e.g. a page written before an interrupted export could save its progress.
+        A rewritten Parquet page replaces its part file, so those exports need no truncation.
+        """
+        if size is not None and os.path.exists(self.path) and os.path.getsize(self.path) > size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(size)
+
+    def write_page(self, df: pd.DataFrame, page_number: int):
+        if self.export_format == 'csv':
+            df.to_csv(self.path, mode='a', index=False, header=not self.size())
+        elif self.export_format == 'jsonl':
+            with open(self.path, 'a') as f:
+                f.write(df.to_json(orient='records', lines=True))
+                f.write('\n')
+        elif self.export_format == 'parquet':
+            os.makedirs(self.path, exist_ok=True)
+            df.to_parquet(os.path.join(self.path, f'part-{page_number:05d}.parquet'), index=False, compression='zstd')
+        else:
+            raise ValueError(f'Unsupported export format {self.export_format}. Valid formats are: {", ".join(STREAM_FORMATS)}')
+
+
+def _progress_path(export_path: str) -> str:
+    return f'{export_path.rstrip(os.sep)}.progress.json'
+
+
+def _load_progress(export_path: str) -> Dict:
+    try:
+        with open(_progress_path(export_path)) as f:
+            return json.load(f)
+    except FileNotFoundError as e:
+        raise ValueError(f'No export progress found for {export_path}') from e
+
+
+def _save_progress(export_path: str, progress: Dict):
+    temp_path = f'{_progress_path(export_path)}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(progress, f)
+    os.replace(temp_path, _progress_path(export_path))
+
+
+def _next_cursor(games: List[Dict], progress: Dict) -> Dict:
+    """
+    Moves the cursor to the oldest game on the page. Games sharing that end date are remembered so the
+    next page, which starts at the same date, skips them instead of losing or duplicating games.
+    """
+    oldest = min(game[GAME_DATE_FIELD] for game in games)
+    boundary_ids = [game[GAME_ID_FIELD] for game in games if game[GAME_DATE_FIELD] == oldest]
+
+    if oldest == progress['cursor']:
+        boundary_ids += progress['boundary_ids']
+    return {'cursor': oldest, 'boundary_ids': boundary_ids}
+
+
+def _warn_ignored_settings(progress: Dict, export_format: Optional[str], page_size: Optional[int], limit_games: Optional[int], filters: Dict):
+    """
+    Tells the user which of the settings entered for a resumed export differ from the saved ones, which are used instead.
+    """
+    ignored = []
+    if export_format and export_format != progress['export_format']:
+        ignored.append('export format')
+    if page_size and int(page_size) != progress['page_size']:
+        ignored.append('page size')
+    if limit_games and int(limit_games) != progress['limit_games']:
+        ignored.append('limit')
+    if {key: value for key, value in filters.items() if value not in (None, [])} != progress['filters']:
+        ignored.append('filters')
+    if ignored:
+        print(f'Ignoring the {", ".join(ignored)} entered, resuming with the export\'s original settings')
+
+
+def stream_games_endpoint(
+    api_manager: APIManager,
+    export_format: Optional[str] = None,
+    page_size: Optional[int] = None,
+    resume_path: Optional[str] = None,
+    limit_games: Optional[int] = None,
+    **filters
+) -> str:
+    """
+    Pages backwards through the games endpoint by end date and writes each page to disk as it arrives.
+
+    Progress, including the size of the export file, is saved after every completed page next to the export,
+    so an interrupted export can be resumed by passing its path as resume_path. Anything written after the
+    last saved page is dropped on resume.
+
+    Args:
+        api_manager (APIManager): The API manager used for the requests.
+        export_format (Optional[str]): One of csv, jsonl or parquet, csv if not set.
+        page_size (Optional[int]): The number of games requested per page, DEFAULT_PAGE_SIZE if not set.
+        resume_path (Optional[str]): The path of a previous export to continue with its original filters and limit.
+        limit_games (Optional[int]): The maximum number of games to export, all matching games if not set.
+        **filters: The games endpoint filters (tag, username, captain, ...).
+
+    Returns:
+        str: The path of the export.
+    """
+    if resume_path:
+        export_path = resume_path
+        progress = _load_progress(export_path)
+        print(f'Resuming {export_path} after {progress["rows_written"]} games')
+        _warn_ignored_settings(progress, export_format, page_size, limit_games, filters)
+    else:
+        export_format = export_format or 'csv'
+        os.makedirs(EXPORT_FOLDER, exist_ok=True)
+        current_date_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        export_path = os.path.join(EXPORT_FOLDER, f'games_data_{current_date_time}.{export_format}')
+        progress = {
+            'filters': {key: value for key, value in filters.items() if value not in (None, [])},
+            'export_format': export_format,
+            'page_size': int(page_size or DEFAULT_PAGE_SIZE),
+            'limit_games': int(limit_games) if limit_games else None,
+            'cursor': None,
+            'boundary_ids': [],
+            'pages': 0,
+            'rows_written': 0,
+            'file_size': 0,
+            'complete': False
+        }
+
+    filters, page_size, limit_games = progress['filters'], progress['page_size'], progress['limit_games']
+    writer = GamesExportWriter(export_path, progress['export_format'])
+    writer.truncate(progress.get('file_size'))
+    cache = get_session().cache
+
+    while not progress['complete']:
+        request_size = page_size if limit_games is None else min(page_size, limit_games - progress['rows_written'])
+        page_filters = filters | {'limit_games': request_size + len(progress['boundary_ids'])}
+        if progress['cursor'] is not None:
+            page_filters['end_date'] = progress['cursor']
+
+        response = web_func.games_endpoint(api_manager=api_manager, **page_filters)
+        seen_ids = set(progress['boundary_ids'])
+        games = [game for game in response.get('games', []) if game[GAME_ID_FIELD] not in seen_ids][:request_size]
+
+        if games:
+            writer.write_page(decode_ids(endpoint_handling.games_endpoints({**response, 'games': games}, cache)), progress['pages'] + 1)
+            progress |= _next_cursor(games, progress)
+            progress['pages'] += 1
+            progress['rows_written'] += len(games)
+            progress['file_size'] = writer.size()
+
+        reached_limit = limit_games is not None and progress['rows_written'] >= limit_games
+        progress['complete'] = len(games) < request_size or reached_limit
+        _save_progress(export_path, progress)
+        print(f'Page {progress["pages"]}: {progress["rows_written"]} games written')
+
+    return export_path
+
+
+def fetch_games_since(
+    api_manager: APIManager,
+    since: Optional[int] = None,
+    known_ids: Optional[List[int]] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    **filters
+) -> Iterator[List[Dict]]:
+    """
+    Yields pages of raw games, newest first, back to the given end date.
+
+    Args:
+        api_manager (APIManager): The API manager used for the requests.
+        since (Optional[int]): The oldest end date to fetch, all games if not set.
+        known_ids (Optional[List[int]]): Ids of games ending exactly at since that were already fetched.
+        page_size (int): The number of games requested per page.
+        **filters: The games endpoint filters (tag, username, captain, ...).
+    """
+    known_ids = set(known_ids or [])
+    progress = {'cursor': None, 'boundary_ids': []}
+    if since is not None:
+        filters = filters | {'start_date': since}
+
+    while True:
+        page_filters = filters | {'limit_games': page_size + len(progress['boundary_ids'])}
+        if progress['cursor'] is not None:
+            page_filters['end_date'] = progress['cursor']
+
+        response = web_func.games_endpoint(api_manager=api_manager, **page_filters)
+        seen_ids = set(progress['boundary_ids'])
+        games = [game for game in response.get('games', []) if game[GAME_ID_FIELD] not in seen_ids][:page_size]
+        if not games:
+            return
+
+        progress = _next_cursor(games, progress)
+        new_games = [game for game in games if since is None or
+                     (game[GAME_DATE_FIELD] > since or (game[GAME_DATE_FIELD] == since and game[GAME_ID_FIELD] not in known_ids))]
+        if new_games:
+            yield new_games
+        if len(games) < page_size or (since is not None and progress['cursor'] < since):
+            return
@@ -1,9 +1,13 @@
 from typing import List, Optional, Union, Callable
 from datetime import datetime
-import pytz
-import json
 
-from pyRio.web_functions import community_members
+from lazy_imports import lazy_import
+from lookup_tables import char_table
+from stat_file_loader import load_stat_file_header
+
+pytz = lazy_import('pytz')
+
+STAT_FILE_DATE_FORMAT = '%a %b %d %H:%M:%S %Y'
 
 
 class InputConverters:
@@ -22,6 +26,10 @@ class InputConverters:
             print(f"An error occurred: {e}")
             return []
         
+    @staticmethod
+    def split_usernames(text):
+        return [username.strip() for username in text.split(',') if username.strip()]
+
     @staticmethod
     def yes_to_1_converter(y_or_n):
         conversion_dict = {
@@ -40,8 +48,14 @@ class InputConverters:
 
         return conversion_dict[y_or_n]
     
+    @staticmethod
+    def char_name_to_id(char_name):
+        return char_table().id(char_name)
+
     @staticmethod
     def dictionary_conversion(key, dictionary):
+        if callable(dictionary):
+            dictionary = dictionary()
         return dictionary[key]
     
     @staticmethod
@@ -65,24 +79,26 @@ class InputConverters:
         return user_action_dict
     
     @staticmethod
-    def stat_file_converter(stat_file_path, cache_instance):
-        with open(stat_file_path) as f:
-            hud_data = json.load(f)
+    def stat_file_date(date_end):
+        # Older stat files store the end date as text in Eastern time instead of a timestamp
+        if isinstance(date_end, int) or str(date_end).isdigit():
+            return int(date_end)
+        naive_datetime = datetime.strptime(date_end, STAT_FILE_DATE_FORMAT)
+        return int(pytz.timezone('America/New_York').localize(naive_datetime).timestamp())
+
+    @staticmethod
+    def stat_file_to_submission(hud_data, tag_set_names):
+        """
+        Builds the manual game submission for a parsed stat file.
 
-        game_id_hex = int(hud_data['GameID'].replace(",", ""))
+        Args:
+            hud_data (dict): The stat file contents.
+            tag_set_names (dict): Tag set names keyed by tag set id.
+        """
         away_score = hud_data['Away Score']
         home_score = hud_data['Home Score']
-        tag_set_id = hud_data['TagSetID']
-
-        reversed_dict = {v: k for k, v in cache_instance.game_mode_dictionary().items()}
-        tag_set_name = reversed_dict[tag_set_id]
-        
-        try:
-            date = int(hud_data['Date - End'])
-        except:
-            datetime_format = "%a %b %d %H:%M:%S %Y"
-            est_time = datetime.strptime(hud_data['Date - End'], datetime_format).replace(tzinfo=pytz.timezone("America/New_York"))
-            date = int(est_time.timestamp())
+        tag_set_name = tag_set_names[hud_data['TagSetID']]
+        date = InputConverters.stat_file_date(hud_data['Date - End'])
 
         if away_score > home_score:
             winner_username = hud_data['Away Player']
@@ -98,7 +114,6 @@ class InputConverters:
             raise Exception('Stat file supplied has no winner')
         
         manual_submit_dict = {
-            #'game_id_hex': game_id_hex,
             'winner_username': winner_username,
             'winner_score': winner_score,
             'loser_username': loser_username,
@@ -108,6 +123,14 @@ class InputConverters:
         }
 
         return manual_submit_dict
+
+    @staticmethod
+    def stat_file_converter(stat_file_path, tag_set_names):
+        hud_data = load_stat_file_header(stat_file_path)
+
+        if callable(tag_set_names):
+            tag_set_names = tag_set_names()
+        return InputConverters.stat_file_to_submission(hud_data, tag_set_names)
     
     @staticmethod
     def date_processing(date_string, eod=False):
@@ -123,21 +146,6 @@ class InputConverters:
         # Return the timestamp
         return int(est_datetime.timestamp())
     
-    @staticmethod
-    def remove_all_users_list(y_or_n, cache_instance, manager):
-        print(y_or_n)
-        if y_or_n == 'y':
-            user_list = []
-            for user_dict in community_members(manager, 'Rookie Rumble')['Members']:
-                try:
-                    user_name = InputConverters.dictionary_conversion(str(user_dict['user_id']), cache_instance.users_dictionary())
-                except:
-                    continue
-                user_list.append(InputConverters.community_manager_converter(user_name, remove=True))
-            return user_list
-        else:
-            return None
-        
     @staticmethod
     def merge_list_of_dicts(dict_list):
         if type(dict_list) is str:
@@ -0,0 +1,230 @@
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+import pyRio.web_functions as web_func
+from pyRio.api_manager import APIManager
+from cache_snapshot import DEFAULT_CACHE_DIR
+from game_warehouse import GameWarehouse, get_warehouse
+from lazy_imports import lazy_import
+from session import get_session
+
+pd = lazy_import('pandas')
+
+LADDER_DIR = os.path.join(DEFAULT_CACHE_DIR, 'ladders')
+LADDER_VERSION = 2
+DEFAULT_RATING = 1500.0
+DEFAULT_K_FACTOR = 32.0
+
+# Fields of each player in the server's game_mode_ladder response
+SERVER_RATING_FIELD = 'rating'
+SERVER_WINS_FIELD = 'num_wins'
+SERVER_LOSSES_FIELD = 'num_losses'
+
+# Positions in a warehouse ladder row: [game_id, date_time_end, away_user, home_user, away_score, home_score]
+GAME_ID, GAME_DATE, AWAY_USER, HOME_USER, AWAY_SCORE, HOME_SCORE = range(6)
+
+
+class Ladder:
+    def __init__(self, k_factor: float = DEFAULT_K_FACTOR, initial_rating: float = DEFAULT_RATING):
+        """
+        Elo ratings and win/loss standings, updated one game at a time in end date order.
+
+        Parameters:
+        - k_factor (float): The most rating points that change hands in one game.
+        - initial_rating (float): The rating of a player's first game.
+        """
+        self.k_factor = k_factor
+        self.initial_rating = initial_rating
+        self.players: Dict[str, Dict] = {}
+
+    def _player(self, username: str) -> Dict:
+        if username not in self.players:
+            self.players[username] = {'rating': self.initial_rating, 'num_wins': 0, 'num_losses': 0}
+        return self.players[username]
+
+    def apply(self, row: list):
+        """
+        Applies one stored game. Games without a winner leave the ladder unchanged.
+        """
+        if row[AWAY_SCORE] == row[HOME_SCORE]:
+            return
+        if row[AWAY_SCORE] > row[HOME_SCORE]:
+            winner, loser = self._player(row[AWAY_USER]), self._player(row[HOME_USER])
+        else:
+            winner, loser = self._player(row[HOME_USER]), self._player(row[AWAY_USER])
+
+        expected = 1 / (1 + 10 ** ((loser['rating'] - winner['rating']) / 400))
+        change = self.k_factor * (1 - expected)
+        winner['rating'] += change
+        loser['rating'] -= change
+        winner['num_wins'] += 1
+        loser['num_losses'] += 1
+
+    def apply_all(self, rows: Iterable[list]):
+        for row in sorted(rows, key=lambda row: (row[GAME_DATE], row[GAME_ID])):
+            self.apply(row)
+
+    def standings(self) -> 'pd.DataFrame':
+        """
+        Returns the ladder by username, highest rating first, with rank, rating, wins, losses and win rate.
+        """
+        df = pd.DataFrame.from_dict(self.players, orient='index', columns=['rating', 'num_wins', 'num_losses'])
+        df.index.name = 'username'
+        df = df.sort_values('rating', ascending=False)
+        df['rating'] = df['rating'].round(1)
+        df['win_rate'] = (df['num_wins'] / (df['num_wins'] + df['num_losses'])).round(3)
+        df.insert(0, 'rank', range(1, len(df) + 1))
+        return df
+
+
+class LocalLadder:
+    def __init__(self, tag_set: str, warehouse: Optional[GameWarehouse] = None, ladder_dir: str = LADDER_DIR):
+        """
+        The ladder of one tag set, kept on disk and brought up to date from the game warehouse.
+
+        The stored ratings remember the last game applied, so each update only applies the games synced
+        since then. The full history is only replayed for what-if ladders over a subset of games.
+
+        Parameters:
+        - tag_set (str): The tag set (game mode) name.
+        - warehouse (Optional[GameWarehouse]): The games to read, the shared warehouse by default.
+        - ladder_dir (str): The directory holding one ratings file per tag set.
+        """
+        self.tag_set = tag_set
+        self.warehouse = warehouse or get_warehouse()
+        self.path = os.path.join(ladder_dir, f'{re.sub(r"[^A-Za-z0-9_.-]", "_", tag_set)}.json')
+        self.ladder = Ladder()
+        # The (date_time_end, game_id) of the last game applied to the ladder
+        self.last_applied: Optional[List[int]] = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                stored = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if stored.get('version') != LADDER_VERSION or stored.get('k_factor') != self.ladder.k_factor:
+            return
+        self.last_applied = stored['last_applied']
+        self.ladder.players = stored['players']
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'version': LADDER_VERSION, 'k_factor': self.ladder.k_factor, 'last_applied': self.last_applied,
+                       'players': self.ladder.players}, f, separators=(',', ':'))
+        os.replace(temp_path, self.path)
+
+    def update(self) -> int:
+        """
+        Applies the warehouse games stored after the last applied game.
+
+        Returns:
+            int: The number of games applied.
+        """
+        rows = self.warehouse.ladder_rows(self.tag_set, after=self.last_applied)
+        if not rows:
+            return 0
+        for row in rows:
+            self.ladder.apply(row)
+        self.last_applied = [rows[-1][GAME_DATE], rows[-1][GAME_ID]]
+        self._save()
+        return len(rows)
+
+    def what_if(
+        self,
+        as_of: Optional[int] = None,
+        exclude_users: Optional[List[str]] = None,
+        players: Optional[List[str]] = None
+    ) -> Ladder:
+        """
+        Replays the stored games into a new ladder, keeping only those that match every given filter.
+
+        Args:
+            as_of (Optional[int]): Only games ending at or before this timestamp.
+            exclude_users (Optional[List[str]]): Drop every game involving these players.
+            players (Optional[List[str]]): Only games between two of these players (head-to-head).
+        """
+        exclude_users = set(exclude_users or [])
+        players = set(players or [])
+
+        def included(row: list) -> bool:
+            if as_of is not None and row[GAME_DATE] > as_of:
+                return False
+            if row[AWAY_USER] in exclude_users or row[HOME_USER] in exclude_users:
+                return False
+            return not players or (row[AWAY_USER] in players and row[HOME_USER] in players)
+
+        ladder = Ladder(self.ladder.k_factor, self.ladder.initial_rating)
+        ladder.apply_all(row for row in self.warehouse.ladder_rows(self.tag_set) if included(row))
+        return ladder
+
+
+def _synced_ladder(api_manager: APIManager, tag_set: str) -> LocalLadder:
+    local_ladder = LocalLadder(tag_set)
+    if get_session().cache.offline:
+        print('Offline mode: using the locally stored games')
+    else:
+        print(f'Synced {local_ladder.warehouse.sync(api_manager, tag_set)} new games')
+    local_ladder.update()
+    return local_ladder
+
+
+def local_ladder(
+    api_manager: APIManager,
+    game_mode_name_closed: str,
+    as_of: Optional[int] = None,
+    exclude_users: Optional[List[str]] = None,
+    players: Optional[List[str]] = None
+) -> 'pd.DataFrame':
+    """
+    Computes a game mode's ladder from its locally stored games, after fetching the games played since the last run.
+    Without filters the incrementally maintained ladder is returned as is, otherwise the matching games are replayed.
+    """
+    stored = _synced_ladder(api_manager, game_mode_name_closed)
+    if as_of is None and not exclude_users and not players:
+        return stored.ladder.standings()
+    return stored.what_if(as_of, exclude_users, players).standings()
+
+
+def compare_with_server(standings: 'pd.DataFrame', server_ladder: Dict) -> 'pd.DataFrame':
+    """
+    Joins a local ladder with the server's ladder for the same game mode.
+
+    Returns:
+        pd.DataFrame: One row per player on either ladder with local and server rank, rating, wins and losses,
+        and whether their wins and losses agree. The Spearman correlation of the two ratings is kept in attrs.
+    """
+    server = pd.DataFrame.from_dict(server_ladder, orient='index')
+    server = server.rename(columns={SERVER_RATING_FIELD: 'rating', SERVER_WINS_FIELD: 'num_wins', SERVER_LOSSES_FIELD: 'num_losses'})
+    server = server[['rating', 'num_wins', 'num_losses']].sort_values('rating', ascending=False)
+    server.insert(0, 'rank', range(1, len(server) + 1))
+
+    local = standings[['rank', 'rating', 'num_wins', 'num_losses']]
+    comparison = local.join(server, how='outer', lsuffix='_local', rsuffix='_server')
+    comparison.index.name = 'username'
+    comparison['record_matches'] = ((comparison['num_wins_local'] == comparison['num_wins_server']) &
+                                    (comparison['num_losses_local'] == comparison['num_losses_server']))
+    # Spearman correlation as the Pearson correlation of ranks, which avoids needing scipy
+    comparison.attrs['rating_correlation'] = comparison['rating_local'].rank().corr(comparison['rating_server'].rank())
+    return comparison.sort_values('rank_server')
+
+
+def validate_local_ladder(api_manager: APIManager, game_mode_name_closed: str) -> List:
+    """
+    Compares the local ladder of a game mode with the server's ladder.
+
+    Returns:
+        List: A summary of how closely the ladders agree, followed by the players whose records differ.
+    """
+    standings = _synced_ladder(api_manager, game_mode_name_closed).ladder.standings()
+    comparison = compare_with_server(standings, web_func.game_mode_ladder(api_manager=api_manager, game_mode_name_closed=game_mode_name_closed))
+
+    mismatched = comparison[~comparison['record_matches']]
+    summary = (f'{len(comparison) - len(mismatched)} of {len(comparison)} players have the same wins and losses locally '
+               f'and on the server, rating rank correlation {comparison.attrs["rating_correlation"]:.3f}')
+    return [summary, mismatched]
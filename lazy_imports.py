@@ -0,0 +1,44 @@
+import importlib
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+
+
+class _LazyModule(ModuleType):
+    def __init__(self, name: str):
+        """
+        Stands in for a module until one of its attributes is read, then imports it.
+
+        The import runs once under a lock, as the first read can come from several worker threads at once,
+        e.g. a bulk run parsing or submitting in parallel. Every later read is passed to the imported module.
+        """
+        super().__init__(name)
+        self._lazy_lock = threading.Lock()
+        self._lazy_module = None
+
+    def __getattr__(self, attr: str):
+        if self._lazy_module is None:
+            with self._lazy_lock:
+                if self._lazy_module is None:
+                    self._lazy_module = importlib.import_module(self.__name__)
+        return getattr(self._lazy_module, attr)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Returns the named module without executing it. The import runs on first attribute access,
+    so heavy dependencies like pandas only load once a handler actually uses them.
+
+    Args:
+        name (str): The absolute module name, e.g. 'pandas' or 'pyRio.endpoint_handling'.
+
+    Returns:
+        ModuleType: The module, loaded already if something else imported it first.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f'No module named {name!r}', name=name)
+    return _LazyModule(name)
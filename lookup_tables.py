@@ -0,0 +1,80 @@
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+lookup = lazy_import('pyRio.lookup')
+
+# Id columns of endpoint frames decoded to names, and the name column added next to each
+CHAR_ID_COLUMNS = ('char_id', 'Char ID', 'CharID', 'character_id')
+STADIUM_ID_COLUMNS = ('stadium_id', 'Stadium ID', 'StadiumID')
+CHAR_NAME_COLUMN = 'char_name'
+STADIUM_NAME_COLUMN = 'stadium_name'
+
+
+class LookupTable:
+    def __init__(self, names_by_id: Dict[int, str]):
+        """
+        A two-way id <-> name table with a case-insensitive name lookup and vectorized decoding.
+
+        Parameters:
+        - names_by_id (Dict[int, str]): The names keyed by id.
+        """
+        self.names_by_id = dict(names_by_id)
+        self.ids_by_name = {name: id_ for id_, name in self.names_by_id.items()}
+        self._ids_by_folded_name = {name.casefold(): id_ for name, id_ in self.ids_by_name.items()}
+        self._names_series = None
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.ids_by_name)
+
+    def id(self, name: str) -> int:
+        if name in self.ids_by_name:
+            return self.ids_by_name[name]
+        return self._ids_by_folded_name[name.casefold()]
+
+    def name(self, id_: int) -> str:
+        return self.names_by_id[int(id_)]
+
+    def decode(self, ids: 'pd.Series') -> 'pd.Series':
+        """
+        Maps a whole column of ids to names in one step, leaving NaN for unknown ids.
+        """
+        if self._names_series is None:
+            self._names_series = pd.Series(self.names_by_id)
+        return ids.map(self._names_series)
+
+
+@lru_cache(maxsize=None)
+def char_table() -> LookupTable:
+    return LookupTable(lookup.LookupDicts.CHAR_NAME)
+
+
+@lru_cache(maxsize=None)
+def stadium_table() -> LookupTable:
+    return LookupTable(lookup.LookupDicts.STADIUM)
+
+
+def _decode_column(df: 'pd.DataFrame', id_columns, name_column: str, table: LookupTable) -> 'pd.DataFrame':
+    if name_column in df.columns:
+        return df
+    if df.index.name in id_columns and pd.api.types.is_numeric_dtype(df.index):
+        return df.assign(**{name_column: table.decode(df.index.to_series()).to_numpy()})
+
+    column: Optional[str] = next((column for column in id_columns if column in df.columns), None)
+    if column is None or not pd.api.types.is_numeric_dtype(df[column]):
+        return df
+    df = df.copy()
+    df.insert(df.columns.get_loc(column) + 1, name_column, table.decode(df[column]))
+    return df
+
+
+def decode_ids(df: 'pd.DataFrame') -> 'pd.DataFrame':
+    """
+    Adds character and stadium name columns next to the id columns of an endpoint frame.
+    Frames without id columns, or that already have the name columns, are returned unchanged.
+    """
+    df = _decode_column(df, CHAR_ID_COLUMNS, CHAR_NAME_COLUMN, char_table())
+    return _decode_column(df, STADIUM_ID_COLUMNS, STADIUM_NAME_COLUMN, stadium_table())
@@ -1,17 +1,64 @@
 import sys
+import argparse
 
 from prompt_toolkit import prompt
 from prompt_toolkit.completion import WordCompleter, FuzzyCompleter
 
-from pyRio.api_manager import APIManager
-from pyRio.web_caching import CompleterCache
-from comm_manager_functions import community_functions, tag_functions, game_mode_functions, rio_mod_functions, data_endpoints
+from session import init_session
+
+parser = argparse.ArgumentParser(description='RioWeb command line interface')
+parser.add_argument('--offline', action='store_true', help='Use the cached RioWeb lists without contacting RioWeb')
+parser.add_argument('--export-format', choices=['xlsx', 'parquet', 'feather', 'csv'],
+                    help='File format for endpoint exports (default: $RIOWEBCLI_EXPORT_FORMAT or xlsx)')
+parser.add_argument('--no-cache', action='store_true', help='Always query RioWeb for data endpoints instead of using cached responses')
+parser.add_argument('--import-profile', action='store_true', help='Report the startup time and slowest imports, then exit')
+parser.add_argument('--exit-before-menu', action='store_true', help=argparse.SUPPRESS)
+parser.add_argument('--pool-size', type=int, default=16, help='Number of keep-alive connections to RioWeb (default: 16)')
+parser.add_argument('--timeout', type=float, default=30.0, help='Request timeout in seconds (default: 30)')
+subparsers = parser.add_subparsers(dest='command')
+
+run_parser = subparsers.add_parser('run', help='Run a single function without prompts')
+run_parser.add_argument('group', help='The menu group, e.g. "Manage Communities"')
+run_parser.add_argument('function', help='The function, e.g. "Add Community Members"')
+run_parser.add_argument('--arg', action='append', default=[], metavar='NAME=VALUE',
+                        help='An input keyed by arg_name. JSON values are parsed, e.g. invite_list=\'{"input": ["user1"]}\'')
+
+batch_parser = subparsers.add_parser('batch', help='Run every operation in a JSON or YAML batch file')
+batch_parser.add_argument('batch_file', help='Path to the batch file')
+batch_parser.add_argument('--stop-on-error', action='store_true', help='Stop at the first failed operation')
+
+sync_parser = subparsers.add_parser('sync', help='Fetch the games played since the last sync into the local game warehouse')
+sync_parser.add_argument('tag_sets', nargs='*', metavar='TAG_SET',
+                         help='Tag sets to sync (default: every tag set synced before)')
+
+args = parser.parse_args()
+
+if args.import_profile:
+    import startup_profile
+    sys.exit(startup_profile.main(sys.argv[1:]))
+
+# The session has to exist before the function tables are imported as they read it at import time
+session = init_session(
+    offline=args.offline,
+    export_format=args.export_format,
+    use_response_cache=not args.no_cache,
+    pool_size=args.pool_size,
+    timeout=args.timeout,
+    background_refresh=args.command is None
+)
+
+if args.command in ('run', 'batch'):
+    import batch
+    sys.exit(batch.main(session, args))
+
+if args.command == 'sync':
+    import game_warehouse
+    sys.exit(game_warehouse.main(session, args))
+
+from comm_manager_functions import function_groups as handler_groups
 from prompt_validators import OptionValidator
 from api_parameters import APIParameter
-from function_executer import ParameterProcessor
-
-manager = APIManager()
-cache = CompleterCache(manager)
+from function_executer import ParameterProcessor, print_result
 
 formatted_text = '''
      _____  _   __          __  _      _____ _      _____ 
@@ -23,17 +70,15 @@ formatted_text = '''
          
     '''
 
-function_groups = {
-    'Manage Communities': community_functions,
-    'Manage Game Modes': game_mode_functions,
-    'Manage Tags': tag_functions,
-    'Rio Mod Functions': rio_mod_functions,
-    'Data Endpoints': data_endpoints,
-    'Update Cache': cache.refresh_cache
+function_groups = handler_groups | {
+    'Update Cache': session.refresh_cache
 }
 
 print(formatted_text)
 
+if args.exit_before_menu:
+    sys.exit(0)
+
 while True:
     print(f'\nMenu Options: ')
     for key in function_groups.keys():
@@ -41,6 +86,7 @@ while True:
     print()
 
     selected_function_group = prompt('What would you like to do (or "q" to quit): ',
+                                     rprompt=session.cache_status, refresh_interval=1.0,
                                      completer=FuzzyCompleter(WordCompleter(list(function_groups.keys()) + ['q'], ignore_case=True)),
                                      validator=OptionValidator(list(function_groups.keys()) + ['q']))
 
@@ -48,7 +94,7 @@ while True:
         break
 
     if selected_function_group == 'Update Cache':
-        cache.refresh_cache()
+        session.refresh_cache()
         continue
 
     print()
@@ -61,6 +107,7 @@ while True:
         print()
 
         selected_function_str = prompt('What would you like to do ("b" to go back): ',
+                                       rprompt=session.cache_status, refresh_interval=1.0,
                                        completer=FuzzyCompleter(WordCompleter(list(selected_function_group_dict.keys()), ignore_case=True)),
                                        validator=OptionValidator(list(selected_function_group_dict.keys()) + ['b']))
 
@@ -70,20 +117,8 @@ while True:
         executor = ParameterProcessor()
         selected_function = selected_function_group_dict[selected_function_str]
         function_args = executor.gather_function_args(selected_function.inputs)
-
-        function_args['api_manager'] = manager
-
-        if selected_function.constant_inputs:
-            function_args = function_args | selected_function.constant_inputs
-
-        output = selected_function.func(**function_args)
-        if selected_function.parse_data:
-            result = selected_function.parse_data(cache, output)
-            if isinstance(result, (list, tuple, set)):
-                for item in result:
-                    print(item, '\n')
-            else:
-                print(result)
-
-        if selected_function.refresh_cache:
-            cache.refresh_cache()
+        # A failed request or input the handler rejects goes back to the menu instead of ending the session
+        try:
+            print_result(selected_function.execute(function_args, session))
+        except Exception as e:
+            print(f'Failed: {e}')
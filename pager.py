@@ -0,0 +1,88 @@
+import shutil
+from typing import Optional
+
+import pandas as pd
+from prompt_toolkit import prompt
+
+import data_parsing
+
+DEFAULT_PAGE_ROWS = 50
+# Rows searched per step, so a search stops as soon as it finds a match instead of scanning the whole frame
+SEARCH_CHUNK_ROWS = 5000
+
+
+class DataFramePager:
+    def __init__(self, df: pd.DataFrame, page_rows: int = DEFAULT_PAGE_ROWS):
+        """
+        Shows a DataFrame one page at a time. Only the rows on screen are ever rendered, so listing a
+        20k-member community costs the same as listing a small one.
+
+        Args:
+            df (pd.DataFrame): The frame to show.
+            page_rows (int): The number of rows per page.
+        """
+        self.df = df
+        self.page_rows = page_rows
+        self.position = 0
+
+    def render_page(self) -> str:
+        page = self.df.iloc[self.position:self.position + self.page_rows]
+        with pd.option_context('display.max_rows', None, 'display.max_columns', None,
+                               'display.width', shutil.get_terminal_size().columns):
+            return page.to_string()
+
+    def search(self, text: str) -> Optional[int]:
+        """
+        Returns the position of the first row after the current page start that contains the text
+        in its index or any column, or None if there is none.
+        """
+        for start in range(self.position + 1, len(self.df), SEARCH_CHUNK_ROWS):
+            chunk = self.df.iloc[start:start + SEARCH_CHUNK_ROWS]
+            matches = chunk.index.astype(str).str.contains(text, case=False, regex=False)
+            for column in chunk.columns:
+                matches = matches | chunk[column].map(str).str.contains(text, case=False, regex=False).to_numpy()
+            if matches.any():
+                return start + int(matches.argmax())
+        return None
+
+    def export_from_here(self) -> str:
+        return data_parsing.export_dataframe(self.df.iloc[self.position:], 'listing')
+
+    def run(self):
+        total = len(self.df)
+        while True:
+            print(self.render_page())
+            last_row = min(self.position + self.page_rows, total)
+            command = prompt(f'-- rows {self.position + 1}-{last_row} of {total} -- '
+                             f'[Enter] next, b back, /text search, e export from here, q quit: ').strip()
+
+            if command == 'q':
+                return
+            if command == 'b':
+                self.position = max(0, self.position - self.page_rows)
+            elif command.startswith('/') and len(command) > 1:
+                found = self.search(command[1:])
+                if found is None:
+                    print(f'No rows after row {self.position + 1} contain {command[1:]!r}')
+                else:
+                    self.position = found
+            elif command == 'e':
+                print(f'Exported rows {self.position + 1}-{total} to {self.export_from_here()}')
+            elif last_row >= total:
+                return
+            else:
+                self.position = last_row
+
+
+def print_dataframe(df: pd.DataFrame, interactive: bool, page_rows: int = DEFAULT_PAGE_ROWS):
+    """
+    Pages through large frames in a terminal. Otherwise the frame is printed in page-sized chunks,
+    so the full repr is never built in memory at once.
+    """
+    if interactive and len(df) > page_rows:
+        DataFramePager(df, page_rows).run()
+        return
+
+    with pd.option_context('display.max_rows', None, 'display.max_columns', None):
+        for start in range(0, max(len(df), 1), data_parsing.RENDER_CHUNK_ROWS):
+            print(df.iloc[start:start + data_parsing.RENDER_CHUNK_ROWS].to_string())
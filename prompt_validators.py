@@ -1,16 +1,50 @@
 from prompt_toolkit.validation import Validator, ValidationError
 from datetime import datetime
+from itertools import chain
+from typing import Iterable
 import string
 
 class OptionValidator(Validator):
-    def __init__(self, options):
+    MAX_LISTED_OPTIONS = 20
+
+    def __init__(self, options, extra: Iterable[str] = ()):
+        """
+        Args:
+            options: A list of valid options, or a callable returning one that is resolved on each validation.
+                The membership set is only rebuilt when the callable returns a different object.
+            extra (Iterable[str]): Additional valid options, such as the break key.
+        """
         self.options = options
+        self.extra = tuple(extra)
+        self._resolved = None
+        self._option_set = frozenset()
+
+    def option_set(self) -> frozenset:
+        options = self.options() if callable(self.options) else self.options
+        if options is not self._resolved:
+            self._option_set = frozenset(chain(options, self.extra))
+            self._resolved = options
+        return self._option_set
+
+    def _error_message(self) -> str:
+        # The first distinct options only, so the remaining count taken from the set is not thrown off by
+        # repeated options and a failed keystroke does not walk the whole list
+        options, seen = [], set()
+        for option in chain(self._resolved, self.extra):
+            if option not in seen:
+                seen.add(option)
+                options.append(option)
+                if len(options) == self.MAX_LISTED_OPTIONS:
+                    break
+        remaining = len(self._option_set) - len(options)
+        more = f' ... and {remaining} more' if remaining > 0 else ''
+        return f'Valid options are: {", ".join(options)}{more}'
 
     def validate(self, document):
         text = document.text.strip()
 
-        if text not in self.options:
-            raise ValidationError(message=f'Valid options are: {", ".join(self.options)}')
+        if text not in self.option_set():
+            raise ValidationError(message=self._error_message())
         
 
 class GeckoCodeValidator(Validator):
@@ -55,10 +89,13 @@ class GeckoCodeValidator(Validator):
             )
         
 class DateValidator(Validator):
+    def __init__(self, extra=()):
+        self.extra = extra
+
     def validate(self, document):
         text = document.text
 
-        if text == '':
+        if text == '' or text in self.extra:
             return
 
         try:
@@ -67,9 +104,12 @@ class DateValidator(Validator):
             raise ValidationError(message='Invalid date format. Use MM-DD-YYYY.') from e
         
 class IntValidator(Validator):
+    def __init__(self, extra=()):
+        self.extra = extra
+
     def validate(self, document):
         """
-        Validates that the input is a valid integer.
+        Validates that the input is a valid integer, or one of the extra accepted inputs.
 
         Args:
             document: The Document instance containing the current user input.
@@ -78,6 +118,8 @@ class IntValidator(Validator):
             ValidationError: If the input is not a valid integer.
         """
         text = document.text
+        if text in self.extra:
+            return
         if not text.isdigit():
             raise ValidationError(
                 message="Input must be a valid integer.",
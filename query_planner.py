@@ -0,0 +1,209 @@
+from typing import Any, Dict, List, Optional
+
+import pyRio.web_functions as web_func
+from pyRio.api_manager import APIManager
+from game_warehouse import GameWarehouse, get_warehouse
+from games_export import AWAY_CAPTAIN_FIELD, HOME_CAPTAIN_FIELD
+from lazy_imports import lazy_import
+from session import get_session
+
+pd = lazy_import('pandas')
+
+# Filters choosing which games are read, as accepted by both the games and stats endpoints
+GAME_FILTERS = {'tag', 'exclude_tag', 'username', 'vs_username', 'exclude_username', 'captain', 'vs_captain', 'stadium', 'limit_games'}
+# Filters only the stats endpoint accepts, shaping the stats computed over the chosen games
+STATS_FILTERS = {'games', 'char_id', 'by_user', 'by_swing', 'by_char', 'exclude_nonfair', 'exclude_batting',
+                 'exclude_pitching', 'exclude_fielding', 'exclude_misc'}
+# Game filters RioWeb does not accept, applied to the response or resolved to game ids locally
+LOCAL_ONLY_FILTERS = {'exclude_captain'}
+LIST_FILTERS = {'tag', 'exclude_tag', 'username', 'vs_username', 'exclude_username', 'captain', 'vs_captain',
+                'exclude_captain', 'stadium', 'games', 'char_id'}
+
+
+def normalize_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Puts a games or stats filter dict in canonical form: empty filters and unset flags are dropped, list filters
+    are deduplicated and sorted, and numbers are converted from their prompt strings. Equal queries entered in
+    a different order or with repeats normalize to the same dict.
+    """
+    normalized = {}
+    for key, value in filters.items():
+        if value is None or value == [] or value == 0:
+            continue
+        if key in LIST_FILTERS:
+            values = value if isinstance(value, list) else [value]
+            if key in ('games', 'char_id'):
+                values = [int(item) for item in values]
+            normalized[key] = sorted(set(values))
+        elif key == 'limit_games':
+            normalized[key] = int(value)
+        else:
+            normalized[key] = value
+    return normalized
+
+
+class QueryPlan:
+    def __init__(
+        self,
+        endpoint: str,
+        source: str,
+        server_filters: Dict[str, Any],
+        local_filters: Dict[str, Any],
+        estimated_rows: Optional[int]
+    ):
+        """
+        Where each part of a games or stats query runs.
+
+        Parameters:
+        - endpoint (str): 'games' or 'stats'.
+        - source (str): 'local' if the warehouse answers the whole query, 'server' if RioWeb does, with any
+          local filters applied to its response, or 'local+server' if local game ids are sent to RioWeb.
+        - server_filters (Dict[str, Any]): The filters sent to RioWeb.
+        - local_filters (Dict[str, Any]): The filters applied locally.
+        - estimated_rows (Optional[int]): The games expected to be transferred from RioWeb, or for stats the games it
+          aggregates, None if unknown.
+        """
+        self.endpoint = endpoint
+        self.source = source
+        self.server_filters = server_filters
+        self.local_filters = local_filters
+        self.estimated_rows = estimated_rows
+
+    def __str__(self):
+        estimate = 'unknown' if self.estimated_rows is None else f'~{self.estimated_rows}'
+        measure = 'games transferred' if self.endpoint == 'games' else 'games aggregated by RioWeb'
+        lines = [f'{self.endpoint} query plan: {self.source}, estimated {measure}: {estimate}']
+        if self.server_filters:
+            lines.append(f'  server: {", ".join(sorted(self.server_filters))}')
+        if self.local_filters:
+            lines.append(f'  local: {", ".join(sorted(self.local_filters))}')
+        if self.source == 'server' and self.local_filters and 'limit_games' in self.server_filters:
+            lines.append(f'  note: {", ".join(sorted(self.local_filters))} is applied to the {self.server_filters["limit_games"]} '
+                         f'games returned, so fewer games may be exported')
+        return '\n'.join(lines)
+
+
+def _synced(warehouse: GameWarehouse, filters: Dict[str, Any]) -> bool:
+    tags = filters.get('tag')
+    return bool(tags) and set(tags) <= set(warehouse.synced_tag_sets())
+
+
+def plan_query(endpoint: str, filters: Dict[str, Any], warehouse: Optional[GameWarehouse] = None) -> QueryPlan:
+    """
+    Splits a normalized games or stats query between the local warehouse and RioWeb.
+
+    A games query over synced tag sets is answered locally. A stats query with filters RioWeb does not accept
+    has its games chosen locally and sent as game ids. Otherwise RioWeb gets every filter it accepts and the
+    rest are applied to its response. Estimates come from the warehouse when the tag sets are synced, and
+    are otherwise limited by limit_games.
+    """
+    warehouse = warehouse or get_warehouse()
+    synced = _synced(warehouse, filters)
+    game_filters = {key: value for key, value in filters.items() if key in GAME_FILTERS | LOCAL_ONLY_FILTERS}
+    local_only = {key: value for key, value in filters.items() if key in LOCAL_ONLY_FILTERS}
+    accepted = {key: value for key, value in filters.items() if key not in LOCAL_ONLY_FILTERS}
+    matching_games = warehouse.count(**game_filters) if synced else filters.get('limit_games')
+
+    if endpoint == 'games':
+        if synced:
+            return QueryPlan('games', 'local', {}, filters, 0)
+        # Without local data, games dropped by local-only filters are still transferred
+        return QueryPlan('games', 'server', accepted, local_only, filters.get('limit_games'))
+
+    if local_only:
+        if not synced:
+            raise ValueError(f'{", ".join(sorted(local_only))} can only be applied to tag sets synced locally, '
+                             f'run "python main.py sync" with the tag sets first')
+        stats_only = {key: value for key, value in filters.items() if key in STATS_FILTERS}
+        return QueryPlan('stats', 'local+server', stats_only, game_filters, matching_games)
+    return QueryPlan('stats', 'server', accepted, {}, matching_games)
+
+
+def _exclude_captains(games: List[Dict], captains: List[str]) -> List[Dict]:
+    df = pd.DataFrame(games, columns=[AWAY_CAPTAIN_FIELD, HOME_CAPTAIN_FIELD])
+    keep = ~(df[AWAY_CAPTAIN_FIELD].isin(captains) | df[HOME_CAPTAIN_FIELD].isin(captains))
+    return [games[index] for index in keep.to_numpy().nonzero()[0]]
+
+
+def _server_call(func, **kwargs):
+    response_cache = get_session().response_cache
+    return response_cache.call(func, kwargs) if response_cache else func(**kwargs)
+
+
+def local_tag_sets(plan: QueryPlan) -> List[str]:
+    """
+    Returns the synced tag sets a plan reads from the warehouse.
+    """
+    return [] if plan.source == 'server' else list(plan.local_filters.get('tag', []))
+
+
+def sync_local_tag_sets(api_manager: APIManager, tag_sets: List[str], warehouse: Optional[GameWarehouse] = None):
+    """
+    Fetches the games played since the last sync of tag sets about to be read locally, so local answers are not stale.
+    """
+    if not tag_sets:
+        return
+    if get_session().cache.offline:
+        print('Offline mode: using the locally stored games')
+        return
+    warehouse = warehouse or get_warehouse()
+    new_games = sum(warehouse.sync(api_manager, tag_set) for tag_set in tag_sets)
+    print(f'Synced {new_games} new games')
+
+
+def execute_plan(plan: QueryPlan, api_manager: APIManager, warehouse: Optional[GameWarehouse] = None):
+    """
+    Runs a query plan and returns the response in the shape of the endpoint it stands in for. Tag sets read
+    locally are synced first.
+    """
+    warehouse = warehouse or get_warehouse()
+    sync_local_tag_sets(api_manager, local_tag_sets(plan), warehouse)
+
+    if plan.endpoint == 'games':
+        if plan.source == 'local':
+            return {'games': warehouse.games(**plan.local_filters)}
+        response = _server_call(web_func.games_endpoint, api_manager=api_manager, **plan.server_filters)
+        if plan.local_filters.get('exclude_captain'):
+            response = response | {'games': _exclude_captains(response.get('games', []), plan.local_filters['exclude_captain'])}
+        return response
+
+    return call_stats_endpoint(api_manager, stats_server_params(plan, warehouse))
+
+
+def stats_server_params(plan: QueryPlan, warehouse: Optional[GameWarehouse] = None) -> Dict[str, Any]:
+    """
+    Returns the params a stats plan sends to RioWeb, with its locally chosen games added as game ids.
+    """
+    if plan.source != 'local+server':
+        return plan.server_filters
+    game_ids = (warehouse or get_warehouse()).game_ids(**plan.local_filters)
+    if 'games' in plan.server_filters:
+        game_ids = sorted(set(game_ids) & set(plan.server_filters['games']))
+    if not game_ids:
+        raise ValueError('No locally synced games match these filters')
+    return plan.server_filters | {'games': game_ids}
+
+
+def call_stats_endpoint(api_manager: APIManager, params: Dict[str, Any]) -> Dict:
+    """
+    Calls the stats endpoint through the response cache. Safe to call from worker threads, unlike the warehouse.
+    """
+    return _server_call(web_func.stats_endpoint, api_manager=api_manager, params=params)
+
+
+def planned_games_endpoint(api_manager: APIManager, **filters) -> Dict:
+    """
+    Games endpoint query through the planner, answered locally after a sync when its tag sets have been synced before.
+    """
+    plan = plan_query('games', normalize_filters(filters))
+    print(plan)
+    return execute_plan(plan, api_manager)
+
+
+def planned_stats_endpoint(api_manager: APIManager, params: Dict) -> Dict:
+    """
+    Stats endpoint query through the planner, with filters RioWeb does not accept resolved to local game ids.
+    """
+    plan = plan_query('stats', normalize_filters(params))
+    print(plan)
+    return execute_plan(plan, api_manager)
@@ -0,0 +1,121 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from cache_snapshot import DEFAULT_CACHE_DIR
+
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 200
+
+
+def normalize(value: Any) -> Any:
+    """
+    Normalizes query parameters so equivalent queries share a key: dict keys are sorted, empty
+    filters dropped and lists of plain values sorted, as filter order does not change the result.
+    """
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in sorted(value.items()) if item not in (None, [], {})}
+    if isinstance(value, (list, tuple, set)):
+        items = [normalize(item) for item in value]
+        if all(isinstance(item, (str, int, float)) for item in items):
+            return sorted(items, key=lambda item: (type(item).__name__, item))
+        return items
+    return value
+
+
+class ResponseCache:
+    def __init__(self, cache_dir: str = os.path.join(DEFAULT_CACHE_DIR, 'responses'), ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        A content-addressed on-disk cache of endpoint responses.
+
+        Entries are keyed by a hash of the endpoint name and its normalized parameters, expire after
+        the TTL and are evicted least recently used first once there are more than max_entries.
+
+        Parameters:
+        - cache_dir (str): The directory holding the cached responses.
+        - ttl (float): Seconds a cached response stays valid.
+        - max_entries (int): The maximum number of cached responses kept.
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def key(self, endpoint: str, params: Dict) -> str:
+        payload = json.dumps({'endpoint': endpoint, 'params': normalize(params)}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.json.gz')
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Returns the cached response, or None if it is missing or expired.
+        """
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rt') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, OSError, json.JSONDecodeError):
+            return None
+
+        if time.time() - entry['stored_at'] > self.ttl:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+
+        # The modification time tracks last use for LRU eviction
+        os.utime(path)
+        return entry['response']
+
+    def put(self, key: str, response: Any):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Unique per writer, as concurrent stats queries can store responses at the same time
+        temp_path = f'{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with gzip.open(temp_path, 'wt') as f:
+            json.dump({'stored_at': time.time(), 'response': response}, f, separators=(',', ':'))
+        os.replace(temp_path, self._path(key))
+        self._evict()
+
+    def call(self, func: Callable, function_args: Dict) -> Any:
+        """
+        Returns the cached response of func for these arguments, calling it on a miss. The api_manager is not part of the key.
+        """
+        params = {key: value for key, value in function_args.items() if key != 'api_manager'}
+        key = self.key(func.__name__, params)
+        output = self.get(key)
+        if output is None:
+            output = func(**function_args)
+            self.put(key, output)
+        else:
+            print('Using cached response (run with --no-cache to refetch)')
+        return output
+
+    def _evict(self):
+        # Entries can disappear while listing them, when another thread is evicting at the same time
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith('.json.gz'):
+                continue
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                continue
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        if os.path.isdir(self.cache_dir):
+            for entry in os.scandir(self.cache_dir):
+                os.remove(entry.path)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, List, Optional, TYPE_CHECKING
+
+from pyRio.api_manager import APIManager
+
+from async_client import AsyncRioClient
+from connection_pool import pooled_session, DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT
+from cache_refresher import BackgroundRefresher, DEFAULT_REFRESH_INTERVAL
+from cache_snapshot import SnapshotCache
+from response_cache import ResponseCache
+
+if TYPE_CHECKING:
+    from pyRio.web_caching import CompleterCache
+
+
+class RioSession:
+    def __init__(
+        self,
+        manager: Optional[APIManager] = None,
+        cache: Optional[SnapshotCache] = None,
+        offline: bool = False,
+        export_format: Optional[str] = None,
+        use_response_cache: bool = True,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        background_refresh: bool = False,
+        refresh_interval: float = DEFAULT_REFRESH_INTERVAL
+    ):
+        """
+        Holds the single APIManager and cache shared by the whole CLI.
+
+        Parameters:
+        - manager (Optional[APIManager]): The API manager to use. A new one is created if not supplied.
+        - cache (Optional[SnapshotCache]): The cache to use. A snapshot-backed cache is built from the manager if not supplied.
+        - offline (bool): Whether the default cache should only serve its on-disk snapshot.
+        - export_format (Optional[str]): The file format endpoint data is exported in. Defaults to
+          $RIOWEBCLI_EXPORT_FORMAT, or xlsx if that is not set.
+        - use_response_cache (bool): Whether data endpoint responses are served from and stored in the local response cache.
+        - pool_size (int): The number of keep-alive connections kept open to RioWeb, and of calls the async client runs at once.
+        - timeout (float): The default request timeout in seconds.
+        - background_refresh (bool): Whether to run the background refresher, which refreshes the cache on a timer and
+          takes over refresh_cache() calls instead of blocking until they finish. Scripted runs keep this off so they
+          make no timed refreshes and each operation sees the previous one's changes.
+        - refresh_interval (float): Seconds between timed background refreshes.
+        """
+        self.export_format = export_format or os.environ.get('RIOWEBCLI_EXPORT_FORMAT', 'xlsx')
+        self.manager = manager or APIManager()
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.http_session = pooled_session(self.manager, pool_size, timeout)
+        self._async_client: Optional[AsyncRioClient] = None
+        self.cache = cache or SnapshotCache(self.manager, offline=offline)
+        self.background_refresh = background_refresh
+        self.refresher: Optional[BackgroundRefresher] = None
+        if background_refresh and not self.cache.offline:
+            self.refresher = BackgroundRefresher(self.cache, refresh_interval)
+            self.refresher.start()
+        self.response_cache = ResponseCache() if use_response_cache else None
+
+    @property
+    def async_client(self) -> AsyncRioClient:
+        """
+        The session's AsyncRioClient, created on first use and sharing the manager's keep-alive session.
+        """
+        if self._async_client is None:
+            self._async_client = AsyncRioClient(self.manager, self.pool_size)
+        return self._async_client
+
+    @property
+    def generation(self) -> int:
+        """
+        Increases every time a refresh changes the cached data.
+        """
+        return self.cache.generation
+
+    def refresh_cache(self, resources: Optional[List[str]] = None):
+        """
+        Refreshes the given resource groups, or the whole cache by default. Any change bumps the generation
+        so every CacheSource resolves again on next use.
+        """
+        if self.refresher:
+            self.refresher.request(resources)
+        else:
+            self.cache.refresh_cache(resources)
+
+    def cache_status(self) -> str:
+        """
+        A short cache status for the prompt, e.g. "cache refreshing" or "cache age 42s".
+        """
+        if self.refresher:
+            return self.refresher.status()
+        return 'cache offline' if self.cache.offline else ''
+
+
+class CacheSource:
+    def __init__(self, resolver: Callable[[CompleterCache], Any]):
+        """
+        A lazily resolved value read from the session cache.
+
+        The resolver runs on first call and its result is reused until the session's cache
+        generation changes, so completers and validators never hold a stale snapshot.
+
+        Parameters:
+        - resolver (Callable[[CompleterCache], Any]): Reads the value from the cache.
+        """
+        self.resolver = resolver
+        self._generation = None
+        self._value = None
+        self._extended = {}
+
+    def __call__(self) -> Any:
+        session = get_session()
+        if self._generation != session.generation:
+            self._value = self.resolver(session.cache)
+            self._generation = session.generation
+        return self._value
+
+    def extended(self, extra: List[str]) -> 'CacheSource':
+        """
+        Returns a source that resolves to this source's options followed by the extra options.
+        The same source is returned for the same extras so parameters sharing it also share its list.
+        """
+        key = tuple(extra)
+        if key not in self._extended:
+            self._extended[key] = CacheSource(lambda cache: list(self()) + list(key))
+        return self._extended[key]
+
+
+_session: Optional[RioSession] = None
+
+
+def init_session(**options) -> RioSession:
+    """
+    Creates the application session with the given RioSession options. Must run before any module that calls get_session().
+    """
+    global _session
+    if _session is not None:
+        raise RuntimeError('The Rio session has already been created')
+    _session = RioSession(**options)
+    return _session
+
+
+def get_session() -> RioSession:
+    """
+    Returns the application session, creating it on first use so that every module shares
+    one APIManager and one warm CompleterCache.
+    """
+    global _session
+    if _session is None:
+        _session = RioSession()
+    return _session
@@ -0,0 +1,49 @@
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+IMPORT_TIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+TOP_IMPORTS = 20
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Parses python -X importtime output into (module, self us, cumulative us, depth) rows.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def main(argv: List[str]) -> int:
+    """
+    Starts the CLI under python -X importtime, stopping just before the menu prompt, and reports
+    the time to menu along with the slowest top-level imports.
+    """
+    child_argv = [arg for arg in argv if arg != '--import-profile']
+    command = [sys.executable, '-X', 'importtime', os.path.abspath(sys.argv[0]), '--exit-before-menu'] + child_argv
+
+    start = time.perf_counter()
+    child = subprocess.run(command, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+
+    if child.returncode != 0:
+        print(child.stderr)
+        return child.returncode
+
+    rows = parse_importtime(child.stderr)
+    top_level = sorted((row for row in rows if row[3] == 0), key=lambda row: row[2], reverse=True)
+
+    print(f'Time to menu: {elapsed * 1000:.0f} ms (including interpreter startup)')
+    print(f'Modules imported: {len(rows)}, total import time: {sum(row[1] for row in rows) / 1000:.0f} ms\n')
+    print(f'{"cumulative ms":>14} {"self ms":>8}  module')
+    for module, self_us, cumulative_us, _ in top_level[:TOP_IMPORTS]:
+        print(f'{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {module}')
+    return 0
@@ -0,0 +1,109 @@
+import json
+from functools import lru_cache
+from json.decoder import JSONDecodeError, scanstring
+import re
+from typing import Any, Dict, Iterable
+
+# The top level fields a manual game submission needs. Rio writes them ahead of the large
+# "Character Game Stats" and "Events" sections, so they sit in the first few hundred bytes.
+HEADER_FIELDS = ('GameID', 'Date - End', 'TagSetID', 'Away Player', 'Home Player', 'Away Score', 'Home Score')
+HEADER_READ_SIZE = 16 * 1024
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r'[ \t\n\r]*')
+
+
+@lru_cache(maxsize=None)
+def _orjson():
+    # Imported on first use as it is optional and loading it would slow startup
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def load_stat_file(path: str) -> Dict[str, Any]:
+    """
+    Reads a whole stat file, with orjson when it is installed.
+    """
+    orjson = _orjson()
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path) as f:
+        return json.load(f)
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    return _whitespace.match(text, pos).end()
+
+
+def _top_level_fields(text: str, fields: Iterable[str], complete: bool = True) -> Dict[str, Any]:
+    """
+    Walks the members of the top level object in text, stopping once every field has been read.
+    Raises JSONDecodeError if text ends first, e.g. because it only holds the start of the file. When text
+    is not complete, a value ending at the end of text is treated as cut off, as a number may continue.
+    """
+    wanted = set(fields)
+    found = {}
+    pos = _skip_whitespace(text, 0)
+    if text[pos:pos + 1] != '{':
+        raise JSONDecodeError('Expecting object', text, pos)
+    pos = _skip_whitespace(text, pos + 1)
+    if text[pos:pos + 1] == '}':
+        return found
+
+    while True:
+        if text[pos:pos + 1] != '"':
+            raise JSONDecodeError('Expecting property name enclosed in double quotes', text, pos)
+        key, pos = scanstring(text, pos + 1)
+        pos = _skip_whitespace(text, pos)
+        if text[pos:pos + 1] != ':':
+            raise JSONDecodeError("Expecting ':' delimiter", text, pos)
+        value, pos = _decoder.raw_decode(text, _skip_whitespace(text, pos + 1))
+        if not complete and pos == len(text):
+            raise JSONDecodeError('Value may be truncated', text, pos)
+
+        if key in wanted:
+            found[key] = value
+            if len(found) == len(wanted):
+                return found
+
+        pos = _skip_whitespace(text, pos)
+        delimiter = text[pos:pos + 1]
+        if delimiter == '}':
+            return found
+        if delimiter != ',':
+            raise JSONDecodeError("Expecting ',' delimiter", text, pos)
+        pos = _skip_whitespace(text, pos + 1)
+
+
+def load_stat_file_header(path: str, fields: Iterable[str] = HEADER_FIELDS) -> Dict[str, Any]:
+    """
+    Reads only the given top level fields of a stat file.
+
+    The start of the file is parsed member by member, stopping as soon as every field has been found,
+    so the per-event arrays after the header are never read or decoded. Files whose fields do not all
+    fit in the first HEADER_READ_SIZE characters are loaded in full instead.
+
+    Args:
+        path (str): The stat file.
+        fields (Iterable[str]): The top level fields to read.
+
+    Returns:
+        Dict[str, Any]: The fields present in the file. Missing fields are left out.
+    """
+    fields = tuple(fields)
+    with open(path) as f:
+        text = f.read(HEADER_READ_SIZE)
+        complete = len(text) < HEADER_READ_SIZE
+
+    try:
+        return _top_level_fields(text, fields, complete)
+    except JSONDecodeError:
+        if complete:
+            raise
+
+    stat_file = load_stat_file(path)
+    return {field: stat_file[field] for field in fields if field in stat_file}
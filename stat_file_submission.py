@@ -0,0 +1,139 @@
+import glob
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pyRio.web_functions as web_func
+from pyRio.api_manager import APIManager
+from bulk import BulkExecutor, BulkReport, DEFAULT_MAX_WORKERS
+from input_conversion import InputConverters
+from stat_file_loader import load_stat_file_header
+
+EXPORT_FOLDER = 'endpoint_data'
+DEFAULT_PARSE_WORKERS = DEFAULT_MAX_WORKERS
+
+# (path, GameID, submission, error) for every stat file parsed
+ParsedStatFile = Tuple[str, Optional[str], Optional[Dict], Optional[str]]
+
+
+def find_stat_files(stat_files: str) -> List[str]:
+    """
+    Returns the stat files under a directory, searched recursively, or matching a glob pattern, in sorted order.
+    """
+    stat_files = os.path.expanduser(stat_files.strip())
+    if os.path.isdir(stat_files):
+        paths = glob.glob(os.path.join(stat_files, '**', '*.json'), recursive=True)
+    else:
+        paths = glob.glob(stat_files, recursive=True)
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def parse_stat_file(path: str, tag_set_names: Dict[int, str]) -> ParsedStatFile:
+    """
+    Reads one stat file into its manual game submission. Errors are returned as text rather than raised so one
+    bad file does not stop the batch.
+    """
+    try:
+        hud_data = load_stat_file_header(path)
+        game_id = str(hud_data['GameID']).replace(',', '')
+        return path, game_id, InputConverters.stat_file_to_submission(hud_data, tag_set_names), None
+    except Exception as e:
+        return path, None, None, f'{type(e).__name__}: {e}'
+
+
+def parse_stat_files(paths: List[str], tag_set_names: Dict[int, str], max_workers: int = DEFAULT_PARSE_WORKERS) -> List[ParsedStatFile]:
+    """
+    Parses stat files in input order over a thread pool. Only each file's header is read, so parsing is
+    mostly waiting on the disk.
+    """
+    report = BulkExecutor(max_workers=max_workers, retries=0).run(
+        parse_stat_file,
+        paths,
+        lambda path: {'path': path, 'tag_set_names': tag_set_names},
+        label=f'Parsing {len(paths)} stat files'
+    )
+    return [result.output for result in report.results]
+
+
+def write_submission_report(parsed: List[ParsedStatFile], duplicates: Dict[str, str], report: BulkReport) -> str:
+    """
+    Writes one CSV row per stat file with its GameID, outcome, attempts and error.
+
+    Returns:
+        str: The path of the report.
+    """
+    import pandas as pd
+
+    submitted = {result.item[0]: result for result in report.results}
+    rows = []
+    for path, game_id, _, error in parsed:
+        if error:
+            rows.append({'path': path, 'game_id': '', 'status': 'invalid', 'attempts': 0, 'error': error})
+        elif path in duplicates:
+            rows.append({'path': path, 'game_id': game_id, 'status': 'duplicate', 'attempts': 0,
+                         'error': f'Same GameID as {duplicates[path]}'})
+        else:
+            result = submitted[path]
+            rows.append({'path': path, 'game_id': game_id, 'status': 'submitted' if result.ok else 'failed',
+                         'attempts': result.attempts, 'error': '' if result.ok else str(result.error)})
+
+    os.makedirs(EXPORT_FOLDER, exist_ok=True)
+    current_date_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    report_path = os.path.join(EXPORT_FOLDER, f'stat_file_submission_{current_date_time}.csv')
+    pd.DataFrame(rows, columns=['path', 'game_id', 'status', 'attempts', 'error']).to_csv(report_path, index=False)
+    return report_path
+
+
+def submit_stat_files(
+    api_manager: APIManager,
+    stat_files: str,
+    tag_set_names: Dict[int, str],
+    parse_workers: int = DEFAULT_PARSE_WORKERS,
+    submit_workers: int = DEFAULT_MAX_WORKERS
+) -> str:
+    """
+    Submits every stat file under a directory or matching a glob as a manual game submission.
+
+    Files are parsed in a thread pool, then deduplicated by GameID keeping the first file in sorted order.
+    Submissions run concurrently with retries on rate limits and server errors, and the outcome of every
+    file is written to a CSV report.
+
+    Args:
+        api_manager (APIManager): The API manager used for the submissions.
+        stat_files (str): A directory of stat files or a glob pattern such as stats/**/*.json.
+        tag_set_names (Dict[int, str]): Tag set names keyed by tag set id.
+        parse_workers (int): The number of threads parsing stat files.
+        submit_workers (int): The maximum number of submissions in flight at once.
+
+    Returns:
+        str: A summary of the run and the path of the report.
+    """
+    paths = find_stat_files(stat_files)
+    if not paths:
+        raise ValueError(f'No stat files found for {stat_files}')
+
+    parsed = parse_stat_files(paths, tag_set_names, parse_workers)
+
+    first_path_by_game_id: Dict[str, str] = {}
+    duplicates: Dict[str, str] = {}
+    submissions = []
+    for path, game_id, submission, error in parsed:
+        if error:
+            continue
+        if game_id in first_path_by_game_id:
+            duplicates[path] = first_path_by_game_id[game_id]
+            continue
+        first_path_by_game_id[game_id] = path
+        submissions.append((path, submission))
+
+    report = BulkExecutor(max_workers=submit_workers).run(
+        web_func.manual_game_submit,
+        submissions,
+        lambda item: {'api_manager': api_manager, **item[1]},
+        label=f'Submitting {len(submissions)} games'
+    )
+    report_path = write_submission_report(parsed, duplicates, report)
+
+    invalid = sum(1 for parsed_file in parsed if parsed_file[3])
+    return (f'{len(paths)} stat files: {len(report.succeeded)} submitted, {len(report.failed)} failed, '
+            f'{len(duplicates)} duplicates, {invalid} invalid in {report.elapsed:.1f}s\nReport written to {report_path}')
@@ -0,0 +1,112 @@
+from itertools import product
+from typing import Dict, List, Optional, Union
+
+from pyRio.api_manager import APIManager
+from bulk import BulkExecutor, BulkResult, DEFAULT_MAX_WORKERS
+from data_parsing import export_dataframe
+from lazy_imports import lazy_import
+from lookup_tables import decode_ids
+from query_planner import (call_stats_endpoint, local_tag_sets, normalize_filters, plan_query, stats_server_params,
+                           sync_local_tag_sets)
+from session import get_session
+
+pd = lazy_import('pandas')
+endpoint_handling = lazy_import('pyRio.endpoint_handling')
+
+TAG_SET_COLUMN = 'tag_set'
+GROUP_COLUMN = 'group'
+
+
+def fanout_queries(params: Dict, tag_sets: Optional[List[str]], username_groups: Optional[List[List[str]]]) -> List[Dict]:
+    """
+    Builds one stats query per tag set, per username group, or per pair of both when both are given.
+    Each query has the shared params with the tag or username filter replaced, and the key columns naming it.
+    """
+    queries = []
+    for tag_set, group in product(tag_sets or [None], username_groups or [None]):
+        filters, keys = dict(params), {}
+        if tag_set is not None:
+            filters['tag'] = [tag_set]
+            keys[TAG_SET_COLUMN] = tag_set
+        if group is not None:
+            filters['username'] = group
+            keys[GROUP_COLUMN] = ', '.join(group)
+        queries.append({'keys': keys, 'filters': filters})
+    return queries
+
+
+def stats_fanout(
+    api_manager: APIManager,
+    params: Optional[Dict] = None,
+    tag_sets: Optional[List[str]] = None,
+    username_groups: Optional[List[List[str]]] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS
+) -> Union[str, List]:
+    """
+    Runs the same stats query for several tag sets or username groups concurrently and writes one merged export.
+
+    Every query is planned up front and the tag sets read locally are synced once, then the stats endpoint calls
+    run over a bounded pool with retries, so the wall time is close to that of the slowest query. The results are
+    stacked into one frame with a tag_set and/or group key column in front.
+
+    Args:
+        api_manager (APIManager): The API manager used for the requests.
+        params (Optional[Dict]): Stats filters shared by every query.
+        tag_sets (Optional[List[str]]): The tag sets to compare, each replacing the tag filter.
+        username_groups (Optional[List[List[str]]]): The username groups to compare, each replacing the username filter.
+        max_workers (int): The maximum number of stats queries in flight at once.
+
+    Returns:
+        Union[str, List]: A summary naming the merged export, followed by a report of the failed queries if any.
+        If fewer than two queries are given, or every query fails, nothing is exported and the reason is returned.
+    """
+    queries = fanout_queries(params or {}, tag_sets, username_groups)
+    if len(queries) < 2:
+        return 'Enter at least two tag sets or username groups to compare'
+
+    # Planning reads the warehouse, which stays on this thread
+    planned, failed = [], []
+    for query in queries:
+        try:
+            query['plan'] = plan_query('stats', normalize_filters(query['filters']))
+        except Exception as e:
+            failed.append(BulkResult(query, error=e))
+            continue
+        planned.append(query)
+
+    tag_sets_read = sorted({tag_set for query in planned for tag_set in local_tag_sets(query['plan'])})
+    sync_local_tag_sets(api_manager, tag_sets_read)
+
+    for query in list(planned):
+        try:
+            query['params'] = stats_server_params(query['plan'])
+        except Exception as e:
+            failed.append(BulkResult(query, error=e))
+            planned.remove(query)
+
+    report = BulkExecutor(max_workers=max_workers).run(
+        call_stats_endpoint,
+        planned,
+        lambda query: {'api_manager': api_manager, 'params': query['params']},
+        label=f'{len(planned)} stats queries'
+    )
+    failed += report.failed
+    failures = pd.DataFrame([{**result.item['keys'], 'error': str(result.error)} for result in failed])
+    if not report.succeeded:
+        return ['Every stats query failed, nothing was exported', failures]
+
+    cache = get_session().cache
+    frames = []
+    for result in report.succeeded:
+        df = decode_ids(endpoint_handling.stats_endpoints(result.output, cache))
+        # The index names the user or character of each row, as in the single query export
+        df = df.reset_index(drop=isinstance(df.index, pd.RangeIndex))
+        for position, (column, value) in enumerate(result.item['keys'].items()):
+            df.insert(position, column, value)
+        frames.append(df)
+
+    path = export_dataframe(pd.concat(frames, ignore_index=True), 'stats_comparison')
+    summary = f'{len(report.succeeded)} of {len(queries)} stats queries merged into {path} in {report.elapsed:.1f}s'
+    if not failed:
+        return summary
+    return [summary, failures]